@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import displayio
+
+# Fits the 20 stock answers (288 bytes each at 1 bit per pixel) with room to spare
+DEFAULT_BUDGET_BYTES = 8192
+
+
+def _bitmap_bytes(width: int, height: int) -> int:
+    # 1-bit bitmaps are stored as rows of 32-bit words
+    return (width + 31) // 32 * 4 * height
+
+
+class AnswerCache:
+    """Pre-rendered 1-bit surfaces for a fixed set of answer strings.
+
+    Each answer is rasterized once into a displayio.Bitmap the size of the largest
+    answer, and shown by swapping the bitmap of a single TileGrid. When the memory
+    budget can't hold every answer, the least recently shown one is re-rendered
+    into for the next miss, so nothing is allocated after the cache fills up.
+    """
+
+    def __init__(
+        self,
+        font,
+        answers: list,
+        scale: int = 2,
+        budget_bytes: int = DEFAULT_BUDGET_BYTES,
+        preload: bool = False,
+    ):
+        self.font = font
+        self.answers = set(answers)
+        box = font.get_bounding_box()
+        self._line_height = box[1]
+        # Built-in fonts only report (width, height) and have no descent
+        self._ascent = box[1] + box[3] if len(box) > 3 else box[1]
+
+        self.width = 1
+        self.height = 1
+        for text in answers:
+            lines = text.split("\n")
+            self.width = max(self.width, max(self._line_width(line) for line in lines))
+            self.height = max(self.height, len(lines) * self._line_height)
+        self.capacity = max(1, budget_bytes // _bitmap_bytes(self.width, self.height))
+
+        self._bitmaps = {}
+        self._lru = []  # Least recently shown first
+        self.misses = 0
+
+        self._palette = displayio.Palette(2)
+        self._palette[0] = 0x000000
+        self._palette[1] = 0xFFFFFF
+        self._blank = displayio.Bitmap(self.width, self.height, 2)
+        self.tile_grid = displayio.TileGrid(
+            self._blank,
+            pixel_shader=self._palette,
+            x=-self.width // 2,
+            y=-self.height // 2,
+        )
+        self.group = displayio.Group(scale=scale)
+        self.group.append(self.tile_grid)
+        self.group.hidden = True
+
+        self._order = answers
+        if preload:
+            self.preload()
+
+    def preload(self):
+        """Render as many answers as the budget holds, so showing them is free."""
+        for text in self._order[: self.capacity]:
+            self.get(text)
+
+    def _line_width(self, line: str) -> int:
+        width = 0
+        for char in line:
+            glyph = self.font.get_glyph(ord(char))
+            if glyph is not None:
+                width += glyph.shift_x
+        return width
+
+    def _rasterize(self, text: str, bitmap: displayio.Bitmap):
+        bitmap.fill(0)
+        lines = text.split("\n")
+        top = (self.height - len(lines) * self._line_height) // 2
+        for index, line in enumerate(lines):
+            x = (self.width - self._line_width(line)) // 2
+            baseline = top + index * self._line_height + self._ascent
+            for char in line:
+                glyph = self.font.get_glyph(ord(char))
+                if glyph is None:
+                    continue
+                # Font glyphs are tiles laid out in a single row of the font bitmap
+                bitmap.blit(
+                    x + glyph.dx,
+                    baseline - glyph.height - glyph.dy,
+                    glyph.bitmap,
+                    x1=glyph.tile_index * glyph.width,
+                    y1=0,
+                    x2=(glyph.tile_index + 1) * glyph.width,
+                    y2=glyph.height,
+                    skip_index=0,
+                )
+                x += glyph.shift_x
+
+    def get(self, text: str) -> displayio.Bitmap:
+        bitmap = self._bitmaps.get(text)
+        if bitmap is not None:
+            self._lru.remove(text)
+            self._lru.append(text)
+            return bitmap
+
+        self.misses += 1
+        if len(self._bitmaps) < self.capacity:
+            bitmap = displayio.Bitmap(self.width, self.height, 2)
+        else:
+            # Reuse the least recently shown surface
+            bitmap = self._bitmaps.pop(self._lru.pop(0))
+        self._rasterize(text, bitmap)
+        self._bitmaps[text] = bitmap
+        self._lru.append(text)
+        return bitmap
+
+    def show(self, text: str) -> bool:
+        """Show `text` if it's one of the answers, returns False if it isn't."""
+        if text not in self.answers:
+            return False
+        self.tile_grid.bitmap = self.get(text)
+        self.group.hidden = False
+        return True
+
+    def hide(self):
+        self.group.hidden = True
@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import time
+
+
+class App:
+    """One screen of the badge, run by an AppRunner.
+
+    Subclasses set the class attributes below and override enter(), tick() and
+    exit(). tick() returns the state of the app to switch to, or None to stay.
+    `state` is the app's own sub-state, reset to 0 every time it's entered.
+    """
+
+    name = "App"
+    tick_hz = 30  # How often tick() is called while the app is open
+    frame_rate = 30  # Display refresh budget while the app is open
+    cooldown_ms = 0  # How long to ignore input after the app is entered
+    subsystems = ()  # Names of the subsystems to bring up before entering
+    resumable = True  # Whether to come back to this app after a deep sleep
+
+    def __init__(self):
+        self.state = 0
+        self.entered_ns = 0
+        self.state_ns = 0
+
+    def set_state(self, state: int):
+        self.state = state
+        self.state_ns = time.monotonic_ns()
+
+    def state_ms(self) -> int:
+        """How long the app has been in its current sub-state."""
+        return (time.monotonic_ns() - self.state_ns) // 1_000_000
+
+    @property
+    def cooling_down(self) -> bool:
+        return time.monotonic_ns() - self.entered_ns < self.cooldown_ms * 1_000_000
+
+    def enter(self):
+        pass
+
+    def resume(self, state: int):
+        """Called instead of enter() when coming back from a deep sleep.
+
+        `state` is the sub-state the app was in. By default the app starts over.
+        """
+        self.enter()
+
+    def tick(self) -> int | None:
+        return None
+
+    def exit(self):
+        pass
+
+
+class AppRunner:
+    """Runs the app for the current state, looked up by index in `apps`.
+
+    Only the open app is ticked, at its own tick_hz. `on_enter(app)` is called
+    before an app is entered, e.g. to bring up the subsystems it needs.
+
+    If `resume_state` is given, the first app is resumed in that sub-state rather
+    than entered.
+    """
+
+    def __init__(
+        self, apps: list, state: int, on_enter=None, resume_state: int | None = None
+    ):
+        self.apps = apps
+        self.on_enter = on_enter
+        self.state = self._validate(state)
+        self._resume_state = resume_state
+        self.app = None
+        self._next_tick = 0
+
+    def _validate(self, state: int) -> int:
+        if not 0 <= state < len(self.apps) or self.apps[state] is None:
+            raise RuntimeError(
+                "Invalid app state value. Valid values are 0 to "
+                + str(len(self.apps) - 1)
+            )
+        return state
+
+    def switch(self, state: int):
+        app = self.apps[self._validate(state)]
+        if self.app is not None:
+            self.app.exit()
+            print(self.app.name, "closed")
+        self.state = state
+        self.app = app
+        if self.on_enter is not None:
+            self.on_enter(app)
+        app.entered_ns = time.monotonic_ns()
+        app.set_state(0)
+        print(app.name, "opened")
+        if self._resume_state is not None:
+            app.resume(self._resume_state)
+            self._resume_state = None
+        else:
+            app.enter()
+        self._next_tick = app.entered_ns
+
+    def ns_until_due(self) -> int:
+        return max(self._next_tick - time.monotonic_ns(), 0)
+
+    def tick(self) -> bool:
+        """Tick the open app if it's due, returns True if it was."""
+        if self.app is None:
+            self.switch(self.state)
+        now = time.monotonic_ns()
+        if now < self._next_tick:
+            return False
+        self._next_tick = now + 1_000_000_000 // self.app.tick_hz
+        next_state = self.app.tick()
+        if next_state is not None and next_state != self.state:
+            self.switch(next_state)
+        return True
@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import time
+
+# Brightness is handled as an integer level, written to the display as level / LEVELS
+LEVELS = 100
+
+# Perceptual curve from filtered light sensor reading (raw 16-bit ADC value) to
+#   brightness level, linearly interpolated between points. The eye is much more
+#   sensitive to changes in the dark, so most of the range is at the low end.
+DEFAULT_CURVE = (
+    (0, 4),
+    (500, 15),
+    (1500, 35),
+    (3500, 65),
+    (6500, 100),
+)
+
+
+def _validate_curve(curve: tuple):
+    if len(curve) < 2:
+        raise RuntimeError("Invalid brightness curve. It needs at least two points.")
+    for index, (light, level) in enumerate(curve):
+        if not 0 <= level <= LEVELS:
+            raise RuntimeError(
+                "Invalid brightness level value. Valid values are 0 to " + str(LEVELS)
+            )
+        if index > 0 and light <= curve[index - 1][0]:
+            raise RuntimeError(
+                "Invalid brightness curve. Light values must be increasing."
+            )
+
+
+class AutoBrightness:
+    """Backlight level that follows the ambient light sensor.
+
+    The sensor is sampled at a fixed rate into an integer moving average, the
+    average is mapped through `curve`, and the backlight ramps toward that level
+    one step every `ramp_ms`. Small changes of the target (within `hysteresis`
+    levels) are ignored so the backlight doesn't hunt. display.brightness is only
+    written when the level actually changes, so calling tick() every loop is cheap.
+    """
+
+    def __init__(
+        self,
+        display,
+        sensor,
+        curve: tuple = DEFAULT_CURVE,
+        sample_ms: int = 100,
+        ema_shift: int = 3,
+        hysteresis: int = 3,
+        ramp_ms: int = 20,
+    ):
+        _validate_curve(curve)
+        self.display = display
+        self.sensor = sensor
+        self.curve = curve
+        self.sample_ns = sample_ms * 1_000_000
+        self.ema_shift = ema_shift
+        self.hysteresis = hysteresis
+        self.ramp_ns = ramp_ms * 1_000_000
+        self._ema = None  # Scaled up by ema_shift bits to keep the fraction
+        self.level = round(display.brightness * LEVELS)
+        self.light_target = self.level  # Level the light sensor asks for
+        self.limit = LEVELS
+        self.target = self.level
+        self._next_sample = time.monotonic_ns()
+        self._last_step = self._next_sample
+
+    @property
+    def light(self) -> int:
+        """The filtered light sensor reading."""
+        return 0 if self._ema is None else self._ema >> self.ema_shift
+
+    def level_for(self, light: int) -> int:
+        curve = self.curve
+        if light <= curve[0][0]:
+            return curve[0][1]
+        for index in range(1, len(curve)):
+            (x1, y1) = curve[index]
+            if light < x1:
+                (x0, y0) = curve[index - 1]
+                return y0 + (y1 - y0) * (light - x0) // (x1 - x0)
+        return curve[-1][1]
+
+    def _sample(self):
+        raw = self.sensor.value
+        if self._ema is None:
+            # Start from the first reading rather than ramping up from zero
+            self._ema = raw << self.ema_shift
+            self.light_target = self.level_for(raw)
+            self.target = min(self.light_target, self.limit)
+            self._set_level(self.target)
+            return
+        self._ema += raw - (self._ema >> self.ema_shift)
+        target = self.level_for(self._ema >> self.ema_shift)
+        if abs(target - self.light_target) > self.hysteresis:
+            self.light_target = target
+            self.target = min(target, self.limit)
+
+    def set_limit(self, limit: int | None, immediate: bool = False):
+        """Cap the level at `limit` (None for no cap), e.g. to dim when idle.
+
+        With `immediate` the level jumps to the new target instead of ramping.
+        """
+        self.limit = LEVELS if limit is None else limit
+        self.target = min(self.light_target, self.limit)
+        if immediate:
+            self._set_level(self.target)
+
+    def _set_level(self, level: int):
+        if level != self.level:
+            self.level = level
+            self.display.brightness = level / LEVELS
+
+    def tick(self):
+        now = time.monotonic_ns()
+        if now >= self._next_sample:
+            self._next_sample = now + self.sample_ns
+            self._sample()
+
+        if self.level == self.target:
+            self._last_step = now
+            return
+        # Steps are based on elapsed time, so the ramp speed doesn't depend on the loop
+        steps = (now - self._last_step) // self.ramp_ns
+        if steps == 0:
+            return
+        self._last_step += steps * self.ramp_ns
+        if self.target > self.level:
+            self._set_level(min(self.level + steps, self.target))
+        else:
+            self._set_level(max(self.level - steps, self.target))
@@ -0,0 +1,38 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import struct
+import microcontroller
+
+# IMU offsets persisted in microcontroller.nvm so they survive power loss and never
+#   need to be measured at wake time
+NVM_OFFSET = 0
+MAGIC = b"C8"
+VERSION = 1
+FORMAT = "<2sB6hB"  # Magic, version, accel xyz, gyro xyz, checksum
+SIZE = struct.calcsize(FORMAT)
+
+
+def _checksum(data: bytearray) -> int:
+    return sum(data[: SIZE - 1]) & 0xFF
+
+
+def save(accel: tuple(int, int, int), gyro: tuple(int, int, int)):
+    data = bytearray(SIZE)
+    struct.pack_into(FORMAT, data, 0, MAGIC, VERSION, *accel, *gyro, 0)
+    data[SIZE - 1] = _checksum(data)
+    # Skip the write (and the flash wear) if nothing changed
+    if microcontroller.nvm[NVM_OFFSET : NVM_OFFSET + SIZE] != data:
+        microcontroller.nvm[NVM_OFFSET : NVM_OFFSET + SIZE] = data
+
+
+def load() -> tuple | None:
+    """Return the stored (accel, gyro) offsets, or None if there aren't any."""
+    data = microcontroller.nvm[NVM_OFFSET : NVM_OFFSET + SIZE]
+    (magic, version, ax, ay, az, gx, gy, gz, checksum) = struct.unpack_from(
+        FORMAT, data
+    )
+    if magic != MAGIC or version != VERSION or checksum != _checksum(data):
+        return None
+    return ((ax, ay, az), (gx, gy, gz))
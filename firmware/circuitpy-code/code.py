@@ -2,91 +2,131 @@
 #
 # SPDX-License-Identifier: MIT
 
+from startup import BootProfiler, Subsystems
+
+# Started first so the imports below are timed too
+boot_profile = BootProfiler()
+
 import alarm
 from analogio import AnalogIn
 from digitalio import DigitalInOut, Direction, Pull
 import board
 import busio
-from qmi8658 import QMI8658
 import terminalio
 import random
-import math
 import displayio
 from touchio import TouchIn
+import asyncio
+import sys
+import supervisor
+
+boot_profile.mark("import core modules")
 from adafruit_display_text.bitmap_label import Label
-import adafruit_imageload
 from gc9a01 import GC9A01
-from time import sleep
-import time
-import countio
-
-MEM_LOC_MODE = 0
-MEM_LOC_COUNT = 1
-
-
-GLOBAL_STATES = {
-    "FIRST_STARTUP": 0,
-    "MAIN": 1,
-    "MAGIC_8": 2,
-    "CHARGER_INFO": 3,
-    "TOUCH_TEST": 4,
-}
-
-CHARGING_STATES = {
-    "CHARGING": 0,
-    "FULL": 1,
-    "NOT_CHARGING": 2,
-}
-
-APP_STATE_CHARGER_INFO = {
-    "ENTER_COOLDOWN": 0,
-    "MAIN": 1,
-}
-
-APP_STATE_MAGIC_8 = {
-    "ENTER_COOLDOWN": 0,
-    "WAITING_FOR_SHAKE": 1,
-    "SHUFFLING": 2,
-    "DISPLAYING_ANSWER": 3,
-}
-
-APP_STATE_TOUCH_TEST = {
-    "ENTER_COOLDOWN": 0,
-    "MAIN": 1,
-}
-
-MAIN_MENU_OPTIONS = {
-    "MAGIC_8": 0,
-    "CHARGER_INFO": 1,
-    "TOUCH_TEST": 2,
-    "SLEEP": 3,
-}
-
-MAIN_MENU_STATE = {
-    "COOLDOWN": 0,
-    "MAIN": 1,
-}
-
-global_state = alarm.sleep_memory[MEM_LOC_MODE]
-if global_state not in GLOBAL_STATES.values():
-    print("Hm, I don't recognize this mode, resetting to first startup:", global_state)
-    global_state = GLOBAL_STATES["FIRST_STARTUP"]
-    alarm.sleep_memory[MEM_LOC_MODE] = global_state
+
+boot_profile.mark("import libraries")
+from qmi8658 import QMI8658, QMI8658TimeoutError, INT_PIN_1, PRESET_IDLE
+import calibration
+import snapshot
+from render import RenderScheduler
+from brightness import AutoBrightness, LEVELS
+import sprites
+from answer_cache import AnswerCache
+from polar import polar_to_cartesian, RingLayout
+from tween import Animator
+from app import App, AppRunner
+from events import EventQueue
+from power import PowerManager, POWER_BLANK
+from profiler import LoopProfiler
+from touch import (
+    TouchInput,
+    EVENT_PRESS,
+    EVENT_RELEASE,
+    EVENT_CHORD,
+    event_type,
+    event_pads,
+)
+
+boot_profile.mark("import badge modules")
+
+
+# Global (app) states, also the index of each app in APPS
+STATE_FIRST_STARTUP = 0
+STATE_MAIN = 1
+STATE_MAGIC_8 = 2
+STATE_CHARGER_INFO = 3
+STATE_TOUCH_TEST = 4
+STATE_CALIBRATE = 5
+STATE_COUNT = 6
+
+CHARGING = 0
+CHARGING_FULL = 1
+NOT_CHARGING = 2
+
+# Touch pad bits in input events
+PAD_R = 1 << 0
+PAD_U = 1 << 1
+PAD_D = 1 << 2
+PAD_L = 1 << 3
+PAD_B = 1 << 4
+PAD_A = 1 << 5
+PAD_D_PAD = PAD_R | PAD_U | PAD_D | PAD_L
+CHORD_PIN_INFO = PAD_D | PAD_U
+
+# Events passed from the sensor task to the apps
+EVENT_SHAKE = 1
+
+# How often each task runs, in milliseconds
+INPUT_PERIOD_MS = 20
+SENSOR_PERIOD_MS = 20
+BRIGHTNESS_PERIOD_MS = 20
+CHARGER_PERIOD_MS = 500
+POWER_PERIOD_MS = 100
+BLANK_SLEEP_MS = 100  # Light sleep between input scans while the screen is off
+SPLASH_BUDGET_MS = 1500  # First frame out this long after code.py starts
+
+# Loop profiling, off by default. When on, send "p" over serial to print latency
+#   histograms for each app state, or "r" to reset them.
+PROFILE_LOOP = False
+PROFILE_CHANNELS = (
+    "loop",
+    "app",
+    "input",
+    "sensor",
+    "brightness",
+    "charger",
+    "power",
+    "render",
+)
+PROF_LOOP = 0  # Time between app task wakeups, the rest are handler latency
+PROF_APP = 1
+PROF_INPUT = 2
+PROF_SENSOR = 3
+PROF_BRIGHTNESS = 4
+PROF_CHARGER = 5
+PROF_POWER = 6
+PROF_RENDER = 7
+
+# Carry on from where the badge went to sleep, if it left a (valid) snapshot
+restored = snapshot.load()
+if restored is not None and restored.app >= STATE_COUNT:
+    print("Hm, I don't recognize this mode, resetting to first startup:", restored.app)
+    restored = None
+global_state = STATE_FIRST_STARTUP if restored is None else restored.app
+snapshot.clear()  # Only resume once, a reset after this starts fresh
+# Woken from deep sleep (not powered up or reloaded), so the hardware outside the
+#   RP2040 may have kept its state. The IMU checks its registers before trusting
+#   them.
+warm_wake = alarm.wake_alarm is not None and restored is not None
 print("Just woke up, mode is", global_state)
 
 
 def hardware_init():
-    global ambient_light, touch_r, touch_u, touch_d, touch_l, touch_b, touch_a, charging, standby, display, imu
+    global ambient_light, charging, standby, display
     # global shake
 
-    # -- Touch and other IO --
+    # -- Other IO --
     ambient_light = AnalogIn(board.LIGHT_SENSOR)
-    touch_r = TouchIn(board.TOUCH_RIGHT)
-    touch_u = TouchIn(board.TOUCH_UP)
-    touch_d = TouchIn(board.TOUCH_DOWN)
-    touch_l = TouchIn(board.TOUCH_LEFT)
-    touch_b = TouchIn(board.TOUCH_B)
-    touch_a = TouchIn(board.TOUCH_A)
     charging = DigitalInOut(board.CHARGING)
     charging.direction = Direction.INPUT
     charging.pull = Pull.UP
@@ -96,6 +136,9 @@ def hardware_init():
     # shake = countio.Counter(board.SHAKE, pull=Pull.UP)
 
     # -- Display setup --
+    # Always released first: with USB connected, a deep sleep only restarts the VM
+    #   and the display from before it is still holding the pins. The panel is
+    #   always fully set up, since its reset line floats while the RP2040 sleeps.
     displayio.release_displays()
     spi = busio.SPI(clock=board.LCD_SCL, MOSI=board.LCD_SDA)
     display_bus = displayio.FourWire(
@@ -113,32 +156,105 @@ def hardware_init():
         backlight_pin=board.LCD_BACKLIGHT,
     )
 
-    # -- Accelerometer/gyro setup --
-    imu = QMI8658(board.IMU_I2C())
-    imu.accel_enabled = True
-    imu.gyro_enabled = True
+
+# The rest of the hardware is brought up by the first app that needs it (see
+#   APP_SUBSYSTEMS), or in the background once the first frame is out
+def touch_init():
+    global touch_input
+    pads = (
+        (TouchIn(board.TOUCH_RIGHT), PAD_R),
+        (TouchIn(board.TOUCH_UP), PAD_U),
+        (TouchIn(board.TOUCH_DOWN), PAD_D),
+        (TouchIn(board.TOUCH_LEFT), PAD_L),
+        (TouchIn(board.TOUCH_B), PAD_B),
+        (TouchIn(board.TOUCH_A), PAD_A),
+    )
+    touch_input = TouchInput(pads, input_events, chords=(CHORD_PIN_INFO,))
 
 
+def imu_init():
+    global imu, imu_offsets
+    # -- Accelerometer/gyro setup --
+    try:
+        # After a shake wake the IMU is only checked against the saved config with
+        #   one burst read, instead of being reset and set up again
+        imu = QMI8658(
+            board.IMU_I2C(),
+            int1=board.IMU_INT1,
+            int2=board.IMU_INT2,
+            config=restored.imu_config if warm_wake else None,
+            offsets=restored.offsets if warm_wake else None,
+        )
+        # After a deep sleep the offsets come from the snapshot, not the NVM
+        if restored is not None and restored.offsets is not None:
+            imu_offsets = restored.offsets
+        else:
+            imu_offsets = calibration.load()
+        if imu.resumed:
+            # The chip kept its setup and offsets, only the host side of the
+            #   interrupt pins needs setting up again
+            imu.configure_interrupts(data_ready=True, motion=INT_PIN_1)
+            return
+        # Nothing reads the gyro, so stay in accel-only mode for motion detection
+        imu.apply_preset(PRESET_IDLE)
+        imu.configure_interrupts(data_ready=True, motion=INT_PIN_1)
+        # Shakes are detected on the IMU itself, so the accel never has to be polled
+        imu.configure_motion(any_motion_mg=750, any_motion_window=3)
+        imu.enable_motion_detection(any_motion=True)
+        if imu_offsets is not None:
+            imu.set_offsets(*imu_offsets)
+    except (RuntimeError, OSError) as e:
+        # Keep the badge usable (D-pad only) if the IMU is missing or wedged
+        print("IMU setup failed:", e)
+        imu = None
+
+
+imu = None
+imu_offsets = None
 hardware_init()
+boot_profile.mark("init display")
+if restored is not None:
+    display.brightness = restored.brightness / LEVELS
+backlight = AutoBrightness(display, ambient_light)
+subsystems = Subsystems(boot_profile)
+subsystems.add("touch", touch_init)
 
 
-def polar_to_cartesian(r, theta_deg):
-    theta_rad = math.radians(theta_deg)
-    x = math.floor(r * math.cos(theta_rad)) + 120
-    y = math.floor(r * math.sin(theta_rad)) + 120
-    return (x, y)
+touch_input = None
+input_events = EventQueue()
+motion_events = EventQueue()
 
 
-# Load the sprite sheet (bitmap)
-sprite_sheet, palette = adafruit_imageload.load(
-    "/cp_sprite_sheet.bmp", bitmap=displayio.Bitmap, palette=displayio.Palette
-)
+def take_presses() -> int:
+    """Drain the input events, returns the pads pressed since the last call."""
+    pressed = 0
+    event = input_events.get()
+    while event is not None:
+        if event_type(event) == EVENT_PRESS:
+            pressed |= event_pads(event)
+        event = input_events.get()
+    return pressed
+
+
+def shaken():
+    return motion_events.get() == EVENT_SHAKE
+
+
+def disable_imu(error):
+    # Carry on without motion (D-pad only) if the IMU stops answering at runtime
+    global imu
+    print("IMU stopped responding, disabling it:", error)
+    imu = None
+
+
+def clear_shakes():
+    motion_events.clear()
+    if imu is not None:
+        try:
+            imu.motion_status  # Reading clears the latched motion flags
+        except (OSError, QMI8658TimeoutError) as e:
+            disable_imu(e)
 
-# Find white and make transparent:
-for index, color in enumerate(palette):
-    if color == 0xFFFFFF:
-        palette.make_transparent(index)
-        break
 
 # Make the display context
 STATUS_BAR_ICON_SIZE = 16
@@ -152,22 +268,11 @@ main_group.append(center)
 
 
 display.root_group = main_group
+# Scene changes are batched and pushed at the current app's frame budget
+renderer = RenderScheduler(display)
 
 
-icons = [
-    displayio.TileGrid(
-        sprite_sheet,
-        pixel_shader=palette,
-        width=1,
-        height=1,
-        tile_width=STATUS_BAR_ICON_SIZE,
-        tile_height=STATUS_BAR_ICON_SIZE,
-        default_tile=i,
-        x=-STATUS_BAR_ICON_SIZE // 2,
-        y=-STATUS_BAR_ICON_SIZE // 2,
-    )
-    for i in range(5)
-]
+icons = []  # Filled in by sprites_init()
 
 
 class Icon:
@@ -187,13 +292,35 @@ status_bar_icons = [
 ]
 
 
+# Status bar slots on the r=92 ring, precomputed for every icon count
+status_bar_layout = RingLayout(radius=92, center_deg=-90, spacing_deg=20)
+
+
+# Icons glide to their slots over a fixed time, however fast the loop is running
+ICON_MOVE_MS = 400
+animator = Animator(renderer)
+
+
+def _icon_mover(index):
+    def move(values):
+        status_bar_icons[index]["current"] = (values[0], values[1])
+        icons[index].x, icons[index].y = polar_to_cartesian(values[0], values[1])
+
+    return move
+
+
+icon_movers = [_icon_mover(index) for index in range(len(status_bar_icons))]
+
+
 def update_targets():
-    spacing_deg = 20
-    shown_icons = [i for i in status_bar_icons if i["show"]]
-    for index, icon in enumerate(shown_icons):
-        theta = -90 - (len(shown_icons) - 1) * spacing_deg / 2 + index * spacing_deg
-        # icons[index].x, icons[index].y = polar_to_cartesian(92, theta)
-        icon["target"] = (92, theta)
+    shown_icons = [index for index, i in enumerate(status_bar_icons) if i["show"]]
+    angles = status_bar_layout.angles(len(shown_icons))
+    for slot, index in enumerate(shown_icons):
+        status_bar_icons[index]["target"] = (status_bar_layout.radius, angles[slot])
+    for index, icon in enumerate(status_bar_icons):
+        animator.animate(
+            index, icon["current"], icon["target"], ICON_MOVE_MS, icon_movers[index]
+        )
 
 
 starting_location = (140, -90)
@@ -224,33 +351,36 @@ def hide_icon(icon):
         update_targets()
 
 
-def update_current():
-    for index in range(len(status_bar_icons)):
-        current = status_bar_icons[index]["current"]
-        target = status_bar_icons[index]["target"]
-        if current != target:
-            current = (
-                current[0] + (target[0] - current[0]) // 2,
-                current[1] + (target[1] - current[1]) // 2,
+def sprites_init():
+    # Load the sprite sheet. The packed sheet (made with firmware/tools/pack_sprites.py)
+    #   already knows its transparent color and is read straight into a bitmap. If it
+    #   isn't there, the BMP is parsed instead. Either way the sheet is kept in RAM,
+    #   since the status bar is always on screen.
+    try:
+        sprite_sheet, palette = sprites.load("/cp_sprite_sheet.m8s")
+    except (OSError, RuntimeError):
+        sprite_sheet, palette = sprites.load_bmp(
+            "/cp_sprite_sheet.bmp", transparent=0xFFFFFF
+        )
+    for i in range(len(status_bar_icons)):
+        icons.append(
+            displayio.TileGrid(
+                sprite_sheet,
+                pixel_shader=palette,
+                width=1,
+                height=1,
+                tile_width=STATUS_BAR_ICON_SIZE,
+                tile_height=STATUS_BAR_ICON_SIZE,
+                default_tile=i,
+                x=-STATUS_BAR_ICON_SIZE // 2,
+                y=-STATUS_BAR_ICON_SIZE // 2,
             )
-            status_bar_icons[index]["current"] = current
-            icons[index].x, icons[index].y = polar_to_cartesian(*current)
+        )
+    load_icons()
 
 
-load_icons()
-iterations = 0
-# while True:
-#     update_current()
-#     sleep(0.04)
-#     iterations += 1
-#     if iterations > 20:
-#         random_icon = random.randint(0, 4)
-#         if status_bar_icons[random_icon]["show"]:
-#             hide_icon(random_icon)
-#         else:
-#             show_icon(random_icon)
-#         iterations = 0
-
+subsystems.add("sprites", sprites_init)
+subsystems.add("imu", imu_init)
 
 my_label = Label(
     terminalio.FONT,
@@ -287,274 +417,442 @@ answers = [
     "Outlook not\nso good",
 ]
 
-i = 0
+# Answers are pre-rendered once instead of re-laid out by the label on every change.
+#   Rendering them all takes a while, so it's done in the background after boot.
+answer_view = AnswerCache(terminalio.FONT, answers, scale=2)
+center.append(answer_view.group)
+subsystems.add("answers", answer_view.preload)
+
 message = None
-new_message = ""
-r = 0
-theta = 0
-dot_pos_x = 0
-dot_pos_y = 0
-dot_vel_x = 0
-dot_vel_y = 0
-latest_time = time.monotonic_ns()
+charging_state = NOT_CHARGING
 
-charging_state = CHARGING_STATES["NOT_CHARGING"]
-app_state = None
-menu_state = None
 
-# global_state = GLOBAL_STATES["TOUCH_TEST"]
+def show_message(text):
+    """Show `text` in the center, as a pre-rendered answer if it is one."""
+    global message
+    if text == message:
+        return
+    message = text
+    if answer_view.show(text):
+        my_label.hidden = True
+    else:
+        answer_view.hide()
+        my_label.hidden = False
+        my_label.text = text
+    renderer.damage()
 
 
-def tick():
-    global charging_state
-    # Adjust the brightness with the light sensor
-    target_brightness = ambient_light.value * 10 / 65535
-    if target_brightness > display.brightness:
-        display.brightness = min(display.brightness + 0.001, 1.0)
-    elif target_brightness < display.brightness:
-        display.brightness = max(display.brightness - 0.001, 0.0)
-
-    # Update the charging status
-    charging_status = not charging.value  # Inverted
-    standby_status = not standby.value  # Inverted
-    if charging_status:
-        charging_state = CHARGING_STATES["CHARGING"]
-    elif standby_status:
-        charging_state = CHARGING_STATES["FULL"]
+def deep_sleep():
+    app = runner.app
+    if app is None or not app.resumable:
+        (state, app_state) = (STATE_MAIN, 0)
     else:
-        charging_state = CHARGING_STATES["NOT_CHARGING"]
-
-    # Update the status bar icons
-
-
-while True:
-    tick()
-    if global_state == GLOBAL_STATES["FIRST_STARTUP"]:
-        # print("First startup")
-        global_state = GLOBAL_STATES["MAIN"]
-    elif global_state == GLOBAL_STATES["MAIN"]:
-        if app_state is None:
-            print("Main menu opened")
-            app_state = MAIN_MENU_STATE["COOLDOWN"]
-            menu_state = MAIN_MENU_OPTIONS["MAGIC_8"]
-            latest_time = time.monotonic_ns()
-        elif app_state == MAIN_MENU_STATE["COOLDOWN"]:
-            if time.monotonic_ns() - latest_time > 300_000_000:
-                app_state = MAIN_MENU_STATE["MAIN"]
-                latest_time = time.monotonic_ns()
-        elif app_state == MAIN_MENU_STATE["MAIN"]:
-            if touch_d.value:
-                menu_state = (menu_state + 1) % len(MAIN_MENU_OPTIONS)
-                latest_time = time.monotonic_ns()
-                app_state = MAIN_MENU_STATE["COOLDOWN"]
-            elif touch_u.value:
-                menu_state = (menu_state - 1) % len(MAIN_MENU_OPTIONS)
-                latest_time = time.monotonic_ns()
-                app_state = MAIN_MENU_STATE["COOLDOWN"]
-            elif touch_a.value:
-                if menu_state == MAIN_MENU_OPTIONS["MAGIC_8"]:
-                    app_state = None
-                    global_state = GLOBAL_STATES["MAGIC_8"]
-                    print("Main menu closed")
-                elif menu_state == MAIN_MENU_OPTIONS["CHARGER_INFO"]:
-                    app_state = None
-                    global_state = GLOBAL_STATES["CHARGER_INFO"]
-                    print("Main menu closed")
-                elif menu_state == MAIN_MENU_OPTIONS["TOUCH_TEST"]:
-                    app_state = None
-                    global_state = GLOBAL_STATES["TOUCH_TEST"]
-                    print("Main menu closed")
-                elif menu_state == MAIN_MENU_OPTIONS["SLEEP"]:
-                    app_state = None
-                    alarm.sleep_memory[MEM_LOC_MODE] = GLOBAL_STATES["MAIN"]
-                    print("Sleeping, wake on shake")
-                    pin_alarm = alarm.pin.PinAlarm(
-                        board.SHAKE, pull=Pull.UP, value=False
-                    )
-                    alarm.exit_and_deep_sleep_until_alarms(pin_alarm)
-        if menu_state == MAIN_MENU_OPTIONS["MAGIC_8"]:
-            new_message = "Magic 8-Ball"
-        elif menu_state == MAIN_MENU_OPTIONS["CHARGER_INFO"]:
-            new_message = "Charging info"
-        elif menu_state == MAIN_MENU_OPTIONS["TOUCH_TEST"]:
-            new_message = "Touch test"
-        elif menu_state == MAIN_MENU_OPTIONS["SLEEP"]:
-            new_message = "Sleep"
-        if new_message != message:
-            message = new_message
-            my_label.text = message
-    elif global_state == GLOBAL_STATES["MAGIC_8"]:
-        if app_state is None:
-            print("Magic 8 app opened")
-            app_state = APP_STATE_MAGIC_8["ENTER_COOLDOWN"]
-            new_message = ""
-            latest_time = time.monotonic_ns()
-        elif app_state == APP_STATE_MAGIC_8["ENTER_COOLDOWN"]:
-            if time.monotonic_ns() - latest_time > 1_000_000_000:
-                app_state = APP_STATE_MAGIC_8["WAITING_FOR_SHAKE"]
-                latest_time = time.monotonic_ns()
-        elif app_state == APP_STATE_MAGIC_8["WAITING_FOR_SHAKE"]:
-            new_message = "Shake me!"
-            if touch_u.value or touch_d.value or touch_l.value or touch_r.value:
-                app_state = APP_STATE_MAGIC_8["SHUFFLING"]
-                latest_time = time.monotonic_ns()
-            elif touch_b.value:
-                app_state = None
-                global_state = GLOBAL_STATES["MAIN"]
-                print("Magic 8 app closed")
-        elif app_state == APP_STATE_MAGIC_8["SHUFFLING"]:
-            new_message = random.choice(answers)
-            if time.monotonic_ns() - latest_time > 1_000_000_000:
-                app_state = APP_STATE_MAGIC_8["DISPLAYING_ANSWER"]
-                latest_time = time.monotonic_ns()
-        elif app_state == APP_STATE_MAGIC_8["DISPLAYING_ANSWER"]:
-            if touch_b.value:
-                app_state = None
-                global_state = GLOBAL_STATES["MAIN"]
-                print("Magic 8 app closed")
-            elif touch_u.value or touch_d.value or touch_l.value or touch_r.value:
-                app_state = APP_STATE_MAGIC_8["SHUFFLING"]
-                latest_time = time.monotonic_ns()
-        if message != new_message:
-            message = new_message
-            my_label.text = message
-    elif global_state == GLOBAL_STATES["CHARGER_INFO"]:
-        if charging_state == CHARGING_STATES["CHARGING"]:
-            new_message = "Charging!"
-        elif charging_state == CHARGING_STATES["FULL"]:
-            new_message = "Fully charged!"
+        (state, app_state) = (runner.state, app.state)
+    snapshot.save(
+        snapshot.Snapshot(
+            state,
+            app_state,
+            APPS[STATE_MAIN].position,
+            APPS[STATE_MAGIC_8].answer_index,
+            backlight.light_target,
+            None if imu is None else imu.config,
+            imu_offsets,
+        )
+    )
+    power.report()
+    print("Sleeping, wake on shake")
+    pin_alarm = alarm.pin.PinAlarm(board.SHAKE, pull=Pull.UP, value=False)
+    alarm.exit_and_deep_sleep_until_alarms(pin_alarm)
+
+
+# Dims, then blanks, then deep sleeps after a while without input or motion
+power = PowerManager(backlight, deep_sleep, wake_pins=(board.SHAKE,))
+
+
+# -- Apps --
+class FirstStartupApp(App):
+    name = "First startup"
+    resumable = False
+
+    def tick(self):
+        return STATE_MAIN
+
+
+class MainMenuApp(App):
+    name = "Main menu"
+    subsystems = ("touch",)
+
+    # Menu entries, the label and the state it opens (None for sleep)
+    OPTIONS = (
+        ("Magic 8-Ball", STATE_MAGIC_8),
+        ("Charging info", STATE_CHARGER_INFO),
+        ("Touch test", STATE_TOUCH_TEST),
+        ("Calibrate", STATE_CALIBRATE),
+        ("Sleep", None),
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.position = 0
+
+    def enter(self):
+        self.position = 0
+
+    def resume(self, state):
+        self.position = restored.menu_position % len(self.OPTIONS)
+
+    def tick(self):
+        pressed = take_presses()
+        if pressed & PAD_D:
+            self.position = (self.position + 1) % len(self.OPTIONS)
+        elif pressed & PAD_U:
+            self.position = (self.position - 1) % len(self.OPTIONS)
+        elif pressed & PAD_A:
+            target = self.OPTIONS[self.position][1]
+            if target is None:
+                self.position = 0  # Wake up at the top of the menu
+                deep_sleep()
+            return target
+        show_message(self.OPTIONS[self.position][0])
+        return None
+
+
+class Magic8App(App):
+    name = "Magic 8 app"
+    frame_rate = 15
+    cooldown_ms = 1000
+    subsystems = ("touch", "imu")
+
+    # Sub-states
+    ENTER_COOLDOWN = 0
+    WAITING_FOR_SHAKE = 1
+    SHUFFLING = 2
+    DISPLAYING_ANSWER = 3
+
+    def __init__(self):
+        super().__init__()
+        self.answer_index = None
+
+    def enter(self):
+        show_message("")
+
+    def resume(self, state):
+        # Put the last answer back up, even if it went to sleep mid-shuffle
+        index = restored.answer_index
+        if state < self.SHUFFLING or index is None or index >= len(answers):
+            self.enter()
+            return
+        self.answer_index = index
+        show_message(answers[index])
+        self.set_state(self.DISPLAYING_ANSWER)
+
+    def tick(self):
+        pressed = take_presses()
+        if self.state == self.ENTER_COOLDOWN:
+            if not self.cooling_down:
+                self.set_state(self.WAITING_FOR_SHAKE)
+                clear_shakes()  # Ignore shakes from before the app opened
+        elif self.state == self.WAITING_FOR_SHAKE:
+            show_message("Shake me!")
+            if shaken() or pressed & PAD_D_PAD:
+                self.set_state(self.SHUFFLING)
+            elif pressed & PAD_B:
+                return STATE_MAIN
+        elif self.state == self.SHUFFLING:
+            # Only swap the answer when it will actually be shown
+            if renderer.frame_due:
+                self.answer_index = random.randrange(len(answers))
+                show_message(answers[self.answer_index])
+            if self.state_ms() > 1000:
+                self.set_state(self.DISPLAYING_ANSWER)
+                clear_shakes()  # Don't let the tail of this shake start another
+        elif self.state == self.DISPLAYING_ANSWER:
+            if pressed & PAD_B:
+                return STATE_MAIN
+            elif shaken() or pressed & PAD_D_PAD:
+                self.set_state(self.SHUFFLING)
+        return None
+
+    def exit(self):
+        show_message("")  # Hides the answer
+
+
+class ChargerInfoApp(App):
+    name = "Charging info app"
+    tick_hz = 10
+    frame_rate = 5
+    subsystems = ("touch",)
+
+    def __init__(self):
+        super().__init__()
+        self.show_pins = False  # While the D+U chord is held
+
+    def enter(self):
+        self.show_pins = False
+
+    def tick(self):
+        event = input_events.get()
+        while event is not None:
+            kind = event_type(event)
+            pads = event_pads(event)
+            if kind == EVENT_CHORD and pads == CHORD_PIN_INFO:
+                self.show_pins = True
+            elif kind == EVENT_RELEASE and pads & CHORD_PIN_INFO:
+                self.show_pins = False
+            elif kind == EVENT_PRESS and pads & (PAD_A | PAD_B):
+                return STATE_MAIN
+            event = input_events.get()
+
+        if charging_state == CHARGING:
+            text = "Charging!"
+        elif charging_state == CHARGING_FULL:
+            text = "Fully charged!"
         else:
-            new_message = "Not charging"
-
-        if app_state is None:
-            print("Charging info app opened")
-            app_state = APP_STATE_CHARGER_INFO["ENTER_COOLDOWN"]
-            latest_time = time.monotonic_ns()
-        elif app_state == APP_STATE_CHARGER_INFO["ENTER_COOLDOWN"]:
-            if time.monotonic_ns() - latest_time > 1_000_000_000:
-                app_state = APP_STATE_CHARGER_INFO["MAIN"]
-                latest_time = time.monotonic_ns()
-        elif app_state == APP_STATE_CHARGER_INFO["MAIN"]:
-            if touch_d.value and touch_u.value:
-                new_message += f"\nCHRG: {'L' if charging.value else 'H'}, STBY: {'L' if standby.value else 'H'}"
-            if touch_a.value or touch_b.value:
-                app_state = None
-                global_state = GLOBAL_STATES["MAIN"]
-                print("Charging info app closed")
-
-        if message != new_message:
-            message = new_message
-            my_label.text = message
-    elif global_state == GLOBAL_STATES["TOUCH_TEST"]:
-        if app_state is None:
-            print("Touch test app opened")
-            app_state = APP_STATE_TOUCH_TEST["ENTER_COOLDOWN"]
-            new_message = ""
-            latest_time = time.monotonic_ns()
-        elif app_state == APP_STATE_TOUCH_TEST["ENTER_COOLDOWN"]:
-            if time.monotonic_ns() - latest_time > 1_000_000_000:
-                app_state = APP_STATE_TOUCH_TEST["MAIN"]
-                latest_time = time.monotonic_ns()
-        elif app_state == APP_STATE_TOUCH_TEST["MAIN"]:
-            new_message = ""
-            new_message += "R" if touch_r.value else " "
-            new_message += "U" if touch_u.value else " "
-            new_message += "D" if touch_d.value else " "
-            new_message += "L" if touch_l.value else " "
-            new_message += "B" if touch_b.value else " "
-            new_message += "A" if touch_a.value else " "
-            if touch_b.value:
-                app_state = None
-                global_state = GLOBAL_STATES["MAIN"]
-                print("Touch test app closed")
-        if message != new_message:
-            message = new_message
-            my_label.text = message
+            text = "Not charging"
+        if self.show_pins:
+            text += f"\nCHRG: {'L' if charging.value else 'H'}, STBY: {'L' if standby.value else 'H'}"
+        show_message(text)
+        return None
+
+
+class TouchTestApp(App):
+    name = "Touch test app"
+    subsystems = ("touch",)
+
+    def enter(self):
+        show_message("")
+
+    def tick(self):
+        pressed = take_presses()
+        text = ""
+        text += "R" if touch_input.held(PAD_R) else " "
+        text += "U" if touch_input.held(PAD_U) else " "
+        text += "D" if touch_input.held(PAD_D) else " "
+        text += "L" if touch_input.held(PAD_L) else " "
+        text += "B" if touch_input.held(PAD_B) else " "
+        text += "A" if touch_input.held(PAD_A) else " "
+        show_message(text)
+        if pressed & PAD_B:
+            return STATE_MAIN
+        return None
+
+
+class CalibrateApp(App):
+    name = "Calibrate app"
+    tick_hz = 10
+    frame_rate = 5
+    cooldown_ms = 2000  # Time to set the badge down
+    subsystems = ("touch", "imu")
+    resumable = False
+
+    # Sub-states
+    SETTLING = 0
+    MAIN = 1
+
+    def enter(self):
+        show_message("Set me down\nand hold still")
+
+    def tick(self):
+        global imu_offsets
+        pressed = take_presses()
+        if self.state == self.SETTLING:
+            if not self.cooling_down:
+                if imu is None:
+                    show_message("No IMU found")
+                else:
+                    try:
+                        imu_offsets = imu.calibrate()
+                        calibration.save(*imu_offsets)
+                        show_message("Calibrated!")
+                    except (OSError, QMI8658TimeoutError) as e:
+                        disable_imu(e)
+                        show_message("IMU stopped\nresponding")
+                    except RuntimeError as e:
+                        print("Calibration failed:", e)
+                        show_message("Moved, try\nagain")
+                self.set_state(self.MAIN)
+        elif pressed & (PAD_A | PAD_B):
+            return STATE_MAIN
+        return None
+
+
+# Indexed by the STATE_* values
+APPS = [None] * STATE_COUNT
+APPS[STATE_FIRST_STARTUP] = FirstStartupApp()
+APPS[STATE_MAIN] = MainMenuApp()
+APPS[STATE_MAGIC_8] = Magic8App()
+APPS[STATE_CHARGER_INFO] = ChargerInfoApp()
+APPS[STATE_TOUCH_TEST] = TouchTestApp()
+APPS[STATE_CALIBRATE] = CalibrateApp()
+
+
+def enter_app(app):
+    subsystems.require(*app.subsystems)
+    input_events.clear()  # Presses were meant for the app being left
+    renderer.set_budget(app.frame_rate)
+    update_status_bar()
+
+
+runner = AppRunner(
+    APPS,
+    global_state,
+    on_enter=enter_app,
+    resume_state=None if restored is None else restored.app_state,
+)
+
+
+profiler = LoopProfiler(
+    tuple(app.name for app in APPS), PROFILE_CHANNELS, enabled=PROFILE_LOOP
+)
+
+
+def update_status_bar():
+    if not subsystems.ready("sprites"):
+        return
+    if charging_state == CHARGING:
+        show_icon(Icon.CAPACITOR)
+    else:
+        hide_icon(Icon.CAPACITOR)
+    if charging_state == CHARGING_FULL:
+        show_icon(Icon.HEART)
+    else:
+        hide_icon(Icon.HEART)
+    if runner.state == STATE_MAIN:
+        show_icon(Icon.BLINKA)
     else:
-        break
-    # new_message = ""
-
-    # Blink the status bar icons ---------------------
-    # icons[1].hidden = True
-    # sleep(0.5)
-    # icons[1].hidden = False
-    # sleep(0.5)
-    # -----------------------------------------------
-
-    # Wiggle the status bar icons --------------------
-    # icons[1].x, icons[1].y = polar(i, 10)
-    # i += 130
-    # -----------------------------------------------
-
-    # -----------------------------------------------
-
-    # Move Blinka around the screen with the D-pad ---
-    # if touch_r.value:
-    #     icons[0].x += 1
-    # if touch_l.value:
-    #     icons[0].x -= 1
-    # if touch_u.value:
-    #     icons[0].y -= 1
-    # if touch_d.value:
-    #     icons[0].y += 1
-    # -----------------------------------------------
-
-    # Move other around in polar coordinates ---------
-    # if touch_r.value:
-    #     r += 1
-    # if touch_l.value:
-    #     r -= 1
-    # if touch_u.value:
-    #     theta += 1
-    # if touch_d.value:
-    #     theta -= 1
-    # icons[4].x, icons[4].y = polar_to_cartesian(r, theta)
-    # new_message = f"r: {r}\ntheta: {theta}"
-    # -----------------------------------------------
-
-    # Roll dots around the screen using the accel ---
-    # (x, y, z) = imu.accel
-    # # adjust the velocity based on the accel, capped at 1
-    # dot_vel_x = max(min(dot_vel_x + x / 100, 1), -1)
-    # dot_vel_y = max(min(dot_vel_y + y / 100, 1), -1)
-    # # adjust the position based on the velocity, capped at 120
-    # dot_pos_x = max(min(dot_pos_x + dot_vel_x, 120), -120)
-    # dot_pos_y = max(min(dot_pos_y + dot_vel_y, 120), -120)
-    # icons[0].x = 120 - math.floor(dot_pos_x)
-    # icons[0].y = 120 - math.floor(dot_pos_y)
-    # print(icons[0].x, icons[0].y)
-    # -----------------------------------------------
-    # Simpler version -------------------------------
-    # (x, y, z) = imu.accel
-    # if x > 0.1 and y > 0.1:
-    #     icons[0].y -= 1
-    # elif x < -0.1 and y < -0.1:
-    #     icons[0].y += 1
-    # elif x > 0.1 and y < -0.1:
-    #     icons[0].x += 1
-    # elif x < -0.1 and y > 0.1:
-    #     icons[0].x -= 1
-    # -----------------------------------------------
-
-    # if message != new_message:
-    #     message = new_message
-    #     my_label.text = message
-
-    # Go to sleep -------------------------------------
-    # print("Sleeping in 3s...")
-    # print(alarm.sleep_memory[0])
-    # new_message = f"Count: {alarm.sleep_memory[0]}"
-    # new_message += f"\n{alarm.wake_alarm}"
-    # if message != new_message:
-    #     message = new_message
-    #     my_label.text = message
-    # sleep(3)
-    # alarm.sleep_memory[0] += 1
-    # time_alarm = alarm.time.TimeAlarm(monotonic_time=time.monotonic() + 5)  # 5 seconds
-    # alarm.exit_and_deep_sleep_until_alarms(time_alarm)
-    # touch_alarm = alarm.touch.TouchAlarm(board.TOUCH_A)
-    # alarm.exit_and_deep_sleep_until_alarms(touch_alarm)  # no touch alarms on RP2040
-    # pin_alarm = alarm.pin.PinAlarm(board.SHAKE, pull=Pull.UP, value=False)
-    # # displayio.release_displays()
-    # alarm.exit_and_deep_sleep_until_alarms(pin_alarm)
-    # -----------------------------------------------
+        hide_icon(Icon.BLINKA)
+
+
+# -- Tasks --
+# Each subsystem runs as its own task at its own rate, and sleeps in between
+
+
+async def input_task():
+    while True:
+        # Every pad is read once per scan, apps only see the resulting events
+        start = profiler.start()
+        if touch_input is not None:
+            touch_input.update()
+            # A touch that wakes the screen only wakes it, apps never see it
+            if touch_input.pressed and power.activity():
+                input_events.clear()
+        profiler.stop(runner.state, PROF_INPUT, start)
+        await asyncio.sleep(INPUT_PERIOD_MS / 1000)
+
+
+async def sensor_task():
+    while True:
+        start = profiler.start()
+        if imu is not None:
+            try:
+                if imu.any_motion:
+                    motion_events.put(EVENT_SHAKE)
+                    power.activity()
+            except (OSError, QMI8658TimeoutError) as e:
+                disable_imu(e)
+        profiler.stop(runner.state, PROF_SENSOR, start)
+        await asyncio.sleep(SENSOR_PERIOD_MS / 1000)
+
+
+async def brightness_task():
+    while True:
+        # Adjust the brightness with the light sensor
+        start = profiler.start()
+        backlight.tick()
+        profiler.stop(runner.state, PROF_BRIGHTNESS, start)
+        await asyncio.sleep(BRIGHTNESS_PERIOD_MS / 1000)
+
+
+async def charger_task():
+    global charging_state
+    while True:
+        start = profiler.start()
+        charging_status = not charging.value  # Inverted
+        standby_status = not standby.value  # Inverted
+        if charging_status:
+            charging_state = CHARGING
+        elif standby_status:
+            charging_state = CHARGING_FULL
+        else:
+            charging_state = NOT_CHARGING
+        update_status_bar()
+        profiler.stop(runner.state, PROF_CHARGER, start)
+        await asyncio.sleep(CHARGER_PERIOD_MS / 1000)
+
+
+async def power_task():
+    while True:
+        start = profiler.start()
+        power.update()
+        profiler.stop(runner.state, PROF_POWER, start)
+        if power.state == POWER_BLANK:
+            # Nothing is on screen, so sleep the whole chip and only wake to let
+            #   the other tasks check for input
+            power.light_sleep(BLANK_SLEEP_MS)
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(POWER_PERIOD_MS / 1000)
+
+
+async def app_task():
+    while True:
+        state = runner.state
+        profiler.period(state, PROF_LOOP)
+        start = profiler.start()
+        if runner.tick():
+            profiler.stop(state, PROF_APP, start)
+        await asyncio.sleep(runner.ns_until_due() / 1_000_000_000)
+
+
+async def render_task():
+    while True:
+        start = profiler.start()
+        if renderer.frame_due:
+            animator.tick()
+        if renderer.tick():
+            profiler.stop(runner.state, PROF_RENDER, start)
+        # Nothing to show, check again one frame from now
+        wait_ns = renderer.ns_until_frame() or 1_000_000_000 // renderer.target_fps
+        await asyncio.sleep(wait_ns / 1_000_000_000)
+
+
+async def startup_task():
+    # Once the first frame is out, bring up the rest one subsystem at a time
+    while renderer.frames == 0:
+        await asyncio.sleep(0)
+    boot_profile.mark("first frame", budget_ms=SPLASH_BUDGET_MS)
+    while subsystems.init_next():
+        await asyncio.sleep(0)
+    boot_profile.report()
+
+
+async def profiler_task():
+    while True:
+        # Serial commands, without blocking when nothing has been sent
+        while supervisor.runtime.serial_bytes_available:
+            command = sys.stdin.read(1)
+            if command == "p":
+                profiler.report()
+            elif command == "r":
+                profiler.reset()
+                print("Loop profile reset")
+        await asyncio.sleep(0.25)
+
+
+async def main():
+    tasks = [
+        asyncio.create_task(app_task()),
+        asyncio.create_task(render_task()),
+        asyncio.create_task(input_task()),
+        asyncio.create_task(sensor_task()),
+        asyncio.create_task(brightness_task()),
+        asyncio.create_task(charger_task()),
+        asyncio.create_task(power_task()),
+        asyncio.create_task(startup_task()),
+    ]
+    if PROFILE_LOOP:
+        tasks.append(asyncio.create_task(profiler_task()))
+    await asyncio.gather(*tasks)
+
+
+asyncio.run(main())
@@ -0,0 +1,44 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+
+
+class EventQueue:
+    """First-in first-out queue of small integer events passed between tasks.
+
+    Events live in a fixed ring buffer, so nothing is allocated after
+    construction. When the queue is full the oldest event is dropped.
+    """
+
+    def __init__(self, size: int = 16):
+        self._events = array("H", [0] * size)
+        self._head = 0
+        self._count = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def put(self, event: int):
+        size = len(self._events)
+        if self._count == size:
+            self._head = (self._head + 1) % size
+            self._count -= 1
+            self.dropped += 1
+        self._events[(self._head + self._count) % size] = event
+        self._count += 1
+
+    def get(self) -> int | None:
+        """Take the oldest event, or None if the queue is empty."""
+        if self._count == 0:
+            return None
+        event = self._events[self._head]
+        self._head = (self._head + 1) % len(self._events)
+        self._count -= 1
+        return event
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
@@ -14,8 +14,9 @@ imu = QMI8658(board.IMU_I2C())
 print("revision:", imu.revision_id, 0x7C)
 print("firmware:", imu.firmware_version)
 print("usid:", imu.usid)
-imu.accel_enabled = True
+# The default accel ODR (8000 Hz) needs the gyro on, so enable it first
 imu.gyro_enabled = True
+imu.accel_enabled = True
 imu.accel_scale = 16
 # imu.gyro_scale = 2048
 
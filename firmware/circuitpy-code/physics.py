@@ -0,0 +1,168 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import time
+from array import array
+
+# Positions are fixed point pixels relative to the screen center. 6 fractional bits
+#   keeps squared distances across the whole screen inside a small int.
+FIXED_SHIFT = 6
+FIXED_ONE = 1 << FIXED_SHIFT
+# Velocities carry 4 more fractional bits, so gentle slopes still get the body moving
+VELOCITY_SHIFT = FIXED_SHIFT + 4
+VELOCITY_EXTRA = VELOCITY_SHIFT - FIXED_SHIFT
+VELOCITY_HALF = 1 << (VELOCITY_EXTRA - 1)
+
+SCREEN_RADIUS = 120
+
+# The most steps one update() will catch up on. After a long stall (like a flash
+#   write) the world skips ahead instead of running slowly to catch up.
+MAX_STEPS_PER_UPDATE = 5
+
+
+def _isqrt(n: int) -> int:
+    if n <= 0:
+        return 0
+    x = n
+    y = (x + 1) >> 1
+    while y < x:
+        x = y
+        y = (x + n // x) >> 1
+    return x
+
+
+class World:
+    """Bodies rolling around inside the round display, pushed by gravity.
+
+    The simulation runs at a fixed `step_ms` timestep no matter how often update()
+    is called, so it behaves the same at any loop or frame rate. State is kept in
+    integer arrays (velocities in fixed point pixels per step), so stepping never
+    allocates. Bodies collide with the edge of the screen but not with each other.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        body_radius: int = 8,
+        step_ms: int = 10,
+        gravity_px: int = 600,
+        restitution: int = 40,
+        damping_shift: int = 7,
+        arena_radius: int = SCREEN_RADIUS,
+    ):
+        """`gravity_px` is how fast 1 g accelerates a body, in pixels per second
+        squared. `restitution` is the percentage of speed kept after a bounce, and
+        1 / 2**`damping_shift` of the velocity is lost to friction every step.
+        """
+        if not 0 <= restitution <= 100:
+            raise RuntimeError(
+                "Invalid restitution value. Valid values are 0 to 100 (percent)."
+            )
+        self.count = count
+        self.step_ns = step_ms * 1_000_000
+        self.restitution = restitution
+        self.damping_shift = damping_shift
+        self.limit = (arena_radius - body_radius) << FIXED_SHIFT
+        # 1 g in fixed point pixels per step per step
+        self._g_per_step = (
+            gravity_px * step_ms * step_ms * (1 << VELOCITY_SHIFT) // 1_000_000
+        )
+        self.gx = 0
+        self.gy = 0
+
+        self.x = array("l", [0] * count)
+        self.y = array("l", [0] * count)
+        self.vx = array("l", [0] * count)
+        self.vy = array("l", [0] * count)
+
+        self._accumulator = 0
+        self._last = time.monotonic_ns()
+
+    def place(self, index: int, x_px: int, y_px: int):
+        """Put a body at rest at (x_px, y_px) from the screen center."""
+        self.x[index] = x_px << FIXED_SHIFT
+        self.y[index] = y_px << FIXED_SHIFT
+        self.vx[index] = 0
+        self.vy[index] = 0
+
+    def x_px(self, index: int) -> int:
+        return self.x[index] >> FIXED_SHIFT
+
+    def y_px(self, index: int) -> int:
+        return self.y[index] >> FIXED_SHIFT
+
+    def set_gravity(self, x: int, y: int, lsb_per_g: int = 16384):
+        """Set gravity from raw accel readings (screen axes, +y pointing down)."""
+        self.gx = x * self._g_per_step // lsb_per_g
+        self.gy = y * self._g_per_step // lsb_per_g
+
+    def feed_accel(
+        self,
+        buffer: bytearray,
+        frames: int,
+        frame_size: int = 6,
+        offset: int = 0,
+        lsb_per_g: int = 16384,
+    ):
+        """Set gravity from the average of a batch of FIFO frames.
+
+        Frames are laid out as filled by QMI8658.read_fifo(). The sensor's x and y
+        axes point the opposite way to the screen's, so both are flipped.
+        """
+        if frames == 0:
+            return
+        sum_x = 0
+        sum_y = 0
+        for i in range(offset, offset + frames * frame_size, frame_size):
+            x = buffer[i] | buffer[i + 1] << 8
+            y = buffer[i + 2] | buffer[i + 3] << 8
+            sum_x += x - 65536 if x & 0x8000 else x
+            sum_y += y - 65536 if y & 0x8000 else y
+        self.set_gravity(-sum_x // frames, -sum_y // frames, lsb_per_g)
+
+    def update(self) -> int:
+        """Run every step that is due, returns how many were run."""
+        now = time.monotonic_ns()
+        self._accumulator += now - self._last
+        self._last = now
+        steps = 0
+        while self._accumulator >= self.step_ns and steps < MAX_STEPS_PER_UPDATE:
+            self._accumulator -= self.step_ns
+            self.step()
+            steps += 1
+        # Time beyond the cap (a stall) is dropped rather than caught up on
+        self._accumulator %= self.step_ns
+        return steps
+
+    def step(self):
+        gx = self.gx
+        gy = self.gy
+        damping = self.damping_shift
+        limit = self.limit
+        for i in range(self.count):
+            # Semi-implicit Euler: velocity first, then position with the new velocity
+            vx = self.vx[i] + gx
+            vy = self.vy[i] + gy
+            vx -= vx >> damping
+            vy -= vy >> damping
+            x = self.x[i] + (vx + VELOCITY_HALF >> VELOCITY_EXTRA)
+            y = self.y[i] + (vy + VELOCITY_HALF >> VELOCITY_EXTRA)
+
+            distance_sq = x * x + y * y
+            if distance_sq > limit * limit:
+                distance = _isqrt(distance_sq)
+                # Back onto the edge of the screen
+                x = x * limit // distance
+                y = y * limit // distance
+                # Reflect the outward part of the velocity, losing some speed
+                outward = (vx * x + vy * y) // limit
+                if outward > 0:
+                    bounce = outward * (100 + self.restitution) // 100
+                    vx -= bounce * x // limit
+                    vy -= bounce * y // limit
+
+            self.x[i] = x
+            self.y[i] = y
+            self.vx[i] = vx
+            self.vy[i] = vy
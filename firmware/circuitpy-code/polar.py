@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import math
+from array import array
+
+# Trig values are fixed point with 14 fractional bits, so r * sin(theta) for any
+#   on-screen radius stays a small int and never allocates a float
+FIXED_SHIFT = 14
+FIXED_ONE = 1 << FIXED_SHIFT
+
+# Quarter-wave sine table at 1 degree resolution, the rest is found by symmetry.
+#   The floats here are only used once, at import.
+_QUARTER_SINE = array(
+    "h", [round(math.sin(math.radians(deg)) * FIXED_ONE) for deg in range(91)]
+)
+
+SCREEN_CENTER = (120, 120)
+
+
+def sin_fixed(theta_deg: int) -> int:
+    theta_deg %= 360
+    if theta_deg <= 90:
+        return _QUARTER_SINE[theta_deg]
+    if theta_deg <= 180:
+        return _QUARTER_SINE[180 - theta_deg]
+    if theta_deg <= 270:
+        return -_QUARTER_SINE[theta_deg - 180]
+    return -_QUARTER_SINE[360 - theta_deg]
+
+
+def cos_fixed(theta_deg: int) -> int:
+    return sin_fixed(theta_deg + 90)
+
+
+def polar_to_cartesian(r: int, theta_deg: int, center: tuple = SCREEN_CENTER) -> tuple:
+    # The arithmetic shift floors, same as math.floor() on the float version
+    x = (r * cos_fixed(theta_deg) >> FIXED_SHIFT) + center[0]
+    y = (r * sin_fixed(theta_deg) >> FIXED_SHIFT) + center[1]
+    return (x, y)
+
+
+class RingLayout:
+    """Evenly spaced slots on a ring, centered on one angle.
+
+    Slot angles are computed once per icon count, so showing or hiding an icon is
+    just a lookup. Icons tween between slots in polar coordinates, so they slide
+    along the ring instead of cutting across it.
+    """
+
+    def __init__(
+        self,
+        radius: int = 92,
+        center_deg: int = -90,
+        spacing_deg: int = 20,
+        max_slots: int = 5,
+    ):
+        self.radius = radius
+        self._angles = []
+        for count in range(max_slots + 1):
+            first = center_deg - (count - 1) * spacing_deg // 2
+            self._angles.append(
+                tuple(first + index * spacing_deg for index in range(count))
+            )
+
+    def angles(self, count: int) -> tuple:
+        return self._angles[count]
@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import time
+import alarm
+
+POWER_ACTIVE = 0
+POWER_DIM = 1
+POWER_BLANK = 2
+POWER_STATE_NAMES = ("active", "dim", "blank")
+
+DEFAULT_DIM_AFTER_MS = 30_000
+DEFAULT_BLANK_AFTER_MS = 60_000
+DEFAULT_SLEEP_AFTER_MS = 180_000
+DIM_LEVEL = 10  # Backlight level limit while dimmed
+
+
+class PowerManager:
+    """Dims, blanks and finally deep sleeps the badge when nobody is using it.
+
+    Call activity() on any input or motion, and update() regularly. After
+    `dim_after_ms` without activity the backlight is limited to DIM_LEVEL, after
+    `blank_after_ms` it's turned off, and after `sleep_after_ms` `deep_sleep()` is
+    called. Time spent in each state, and in light sleep, is counted in ms.
+    """
+
+    def __init__(
+        self,
+        backlight,
+        deep_sleep,
+        dim_after_ms: int = DEFAULT_DIM_AFTER_MS,
+        blank_after_ms: int = DEFAULT_BLANK_AFTER_MS,
+        sleep_after_ms: int = DEFAULT_SLEEP_AFTER_MS,
+        wake_pins: tuple = (),
+    ):
+        if not dim_after_ms <= blank_after_ms <= sleep_after_ms:
+            raise RuntimeError(
+                "Invalid idle timeouts. They must be dim <= blank <= sleep."
+            )
+        self.backlight = backlight
+        self.deep_sleep = deep_sleep
+        self.dim_after_ms = dim_after_ms
+        self.blank_after_ms = blank_after_ms
+        self.sleep_after_ms = sleep_after_ms
+        self.wake_pins = wake_pins  # Pins that end a light sleep early when pulled low
+        self.state = POWER_ACTIVE
+        self.state_ms = [0] * len(POWER_STATE_NAMES)
+        self.light_sleep_ms = 0
+        now = time.monotonic_ns()
+        self._last_activity = now
+        self._last_update = now
+
+    def idle_ms(self) -> int:
+        return (time.monotonic_ns() - self._last_activity) // 1_000_000
+
+    def activity(self) -> bool:
+        """Reset the idle timer, returns True if this woke a dimmed or blank screen."""
+        self._last_activity = time.monotonic_ns()
+        if self.state == POWER_ACTIVE:
+            return False
+        self._set_state(POWER_ACTIVE)
+        return True
+
+    def _set_state(self, state: int):
+        self.state = state
+        if state == POWER_ACTIVE:
+            # Straight back to full brightness, no ramp, so the wake feels instant
+            self.backlight.set_limit(None, immediate=True)
+        elif state == POWER_DIM:
+            self.backlight.set_limit(DIM_LEVEL)
+        else:
+            self.backlight.set_limit(0, immediate=True)
+
+    def update(self):
+        now = time.monotonic_ns()
+        self.state_ms[self.state] += (now - self._last_update) // 1_000_000
+        self._last_update = now
+
+        idle = self.idle_ms()
+        if idle >= self.sleep_after_ms:
+            self.deep_sleep()
+        elif idle >= self.blank_after_ms:
+            if self.state != POWER_BLANK:
+                self._set_state(POWER_BLANK)
+        elif idle >= self.dim_after_ms:
+            if self.state != POWER_DIM:
+                self._set_state(POWER_DIM)
+
+    def light_sleep(self, ms: int):
+        """Sleep the whole chip for `ms`, or until a wake pin goes low.
+
+        Falls back to time.sleep() where light sleep isn't supported.
+        """
+        start = time.monotonic_ns()
+        time_alarm = alarm.time.TimeAlarm(monotonic_time=time.monotonic() + ms / 1000)
+        try:
+            pin_alarms = [
+                alarm.pin.PinAlarm(pin, value=False, pull=True)
+                for pin in self.wake_pins
+            ]
+            alarm.light_sleep_until_alarms(time_alarm, *pin_alarms)
+        except (NotImplementedError, ValueError):
+            time.sleep(ms / 1000)
+        self.light_sleep_ms += (time.monotonic_ns() - start) // 1_000_000
+
+    def report(self):
+        print("Power states (ms):")
+        for name, ms in zip(POWER_STATE_NAMES, self.state_ms):
+            print("  {:>8}  {}".format(ms, name))
+        print("  {:>8}  light sleep".format(self.light_sleep_ms))
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import time
+from array import array
+
+# Histogram bucket n holds times of 2**(n-1) up to 2**n - 1 microseconds, the last
+#   bucket takes anything longer (about 16 s and up)
+DEFAULT_BUCKETS = 25
+
+
+def _bucket(us: int, buckets: int) -> int:
+    bucket = 0
+    while us and bucket < buckets - 1:
+        us >>= 1
+        bucket += 1
+    return bucket
+
+
+class LoopProfiler:
+    """Latency histograms for each channel (task, handler) in each row (app state).
+
+    Times go into log2-bucketed histograms in preallocated arrays, so recording
+    doesn't allocate, apart from the clock reads themselves (monotonic_ns() returns
+    a long int). When `enabled` is False, start() and stop() do nothing and don't
+    read the clock at all.
+    """
+
+    def __init__(
+        self,
+        rows: tuple,
+        channels: tuple,
+        buckets: int = DEFAULT_BUCKETS,
+        enabled: bool = True,
+    ):
+        self.rows = rows
+        self.channels = channels
+        self.buckets = buckets
+        self.enabled = enabled
+        slots = len(rows) * len(channels)
+        self._counts = array("L", [0] * slots)
+        self._max_us = array("L", [0] * slots)
+        self._histograms = array("L", [0] * (slots * buckets))
+        self._last = [0] * slots  # Timestamp of the last period() call
+
+    def reset(self):
+        for index in range(len(self._counts)):
+            self._counts[index] = 0
+            self._max_us[index] = 0
+            self._last[index] = 0
+        for index in range(len(self._histograms)):
+            self._histograms[index] = 0
+
+    def record(self, row: int, channel: int, ns: int):
+        slot = row * len(self.channels) + channel
+        us = ns // 1000
+        self._counts[slot] += 1
+        if us > self._max_us[slot]:
+            self._max_us[slot] = us
+        self._histograms[slot * self.buckets + _bucket(us, self.buckets)] += 1
+
+    def start(self) -> int:
+        return time.monotonic_ns() if self.enabled else 0
+
+    def stop(self, row: int, channel: int, start: int):
+        """Record the time since `start` (from start()) for the channel."""
+        if self.enabled:
+            self.record(row, channel, time.monotonic_ns() - start)
+
+    def period(self, row: int, channel: int):
+        """Record the time since the last period() call for the channel."""
+        if not self.enabled:
+            return
+        slot = row * len(self.channels) + channel
+        now = time.monotonic_ns()
+        if self._last[slot]:
+            self.record(row, channel, now - self._last[slot])
+        self._last[slot] = now
+
+    def percentile_us(self, row: int, channel: int, percent: int) -> int:
+        """Upper bound (in us) of the bucket holding the `percent` percentile."""
+        slot = row * len(self.channels) + channel
+        count = self._counts[slot]
+        if count == 0:
+            return 0
+        wanted = (count * percent + 99) // 100
+        seen = 0
+        first = slot * self.buckets
+        for bucket in range(self.buckets):
+            seen += self._histograms[first + bucket]
+            if seen >= wanted:
+                return min((1 << bucket) - 1, self._max_us[slot])
+        return self._max_us[slot]
+
+    def report(self):
+        print("Loop profile (us, percentiles are bucket upper bounds):")
+        for row, row_name in enumerate(self.rows):
+            if not any(
+                self._counts[row * len(self.channels) + channel]
+                for channel in range(len(self.channels))
+            ):
+                continue
+            print(row_name)
+            print(
+                "  {:<12} {:>8} {:>8} {:>8} {:>8}".format(
+                    "", "count", "p50", "p95", "max"
+                )
+            )
+            for channel, channel_name in enumerate(self.channels):
+                slot = row * len(self.channels) + channel
+                if self._counts[slot] == 0:
+                    continue
+                print(
+                    "  {:<12} {:>8} {:>8} {:>8} {:>8}".format(
+                        channel_name,
+                        self._counts[slot],
+                        self.percentile_us(row, channel, 50),
+                        self.percentile_us(row, channel, 95),
+                        self._max_us[slot],
+                    )
+                )
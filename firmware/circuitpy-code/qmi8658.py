@@ -2,6 +2,8 @@
 #
 # SPDX-License-Identifier: MIT
 
+import struct
+import time
 import busio
 from digitalio import DigitalInOut, Direction, Pull
 from microcontroller import Pin
@@ -97,6 +99,12 @@ REG_RESET = 0x60
 
 # -- CTRL9 Commands --
 CTRL_CMD_ACK = 0x00
+CTRL_CMD_RST_FIFO = 0x04
+CTRL_CMD_REQ_FIFO = 0x05
+CTRL_CMD_ACCEL_HOST_DELTA_OFFSET = 0x09
+CTRL_CMD_GYRO_HOST_DELTA_OFFSET = 0x0A
+CTRL_CMD_CONFIGURE_TAP = 0x0C
+CTRL_CMD_CONFIGURE_MOTION = 0x0E
 CTRL_CMD_COPY_USID = 0x10
 CTRL_CMD_AHB_CLOCK_GATING = 0x12
 
@@ -112,15 +120,158 @@ MASK_STATUSINT_CTRL9DONE = 0b1000_0000
 MASK_STATUSINT_AVAIL = 0b0000_0001
 MASK_STATUSINT_LOCKED = 0b1000_0010
 MASK_REG_CTRL7_SYNC_SAMPLE = 0b1000_0000
+MASK_REG_CTRL7_DRDY_DIS = 0b0010_0000
+MASK_REG_CTRL1_INT2_EN = 0b0001_0000
+MASK_REG_CTRL1_INT1_EN = 0b0000_1000
+MASK_REG_CTRL1_FIFO_INT_SEL = 0b0000_0100
+MASK_REG_CTRL8_HANDSHAKE_STATUSINT = 0b1000_0000
+MASK_REG_CTRL8_ACTIVITY_INT_SEL = 0b0100_0000
+MASK_REG_CTRL8_NO_MOTION_EN = 0b0000_0100
+MASK_REG_CTRL8_ANY_MOTION_EN = 0b0000_0010
+MASK_REG_CTRL8_TAP_EN = 0b0000_0001
+MASK_STATUS1_NO_MOTION = 0b0100_0000
+MASK_STATUS1_ANY_MOTION = 0b0010_0000
+MASK_STATUS1_TAP = 0b0000_0010
+MASK_TAP_STATUS_POLARITY = 0b1000_0000
+MASK_TAP_STATUS_AXIS = 0b0011_0000
+MASK_TAP_STATUS_TYPE = 0b0000_0011
+MASK_MOTION_MODE_ANY_XYZ = 0b0000_0111
+MASK_MOTION_MODE_NO_XYZ = 0b0111_0000
 MASK_ACCEL_FULL_SCALE = 0b0111_0000
 MASK_GYRO_FULL_SCALE = 0b0111_0000
+MASK_ACCEL_ODR = 0b0000_1111
+MASK_GYRO_ODR = 0b0000_1111
+MASK_FIFO_CTRL_RD_MODE = 0b1000_0000
+MASK_FIFO_CTRL_SIZE = 0b0000_1100
+MASK_FIFO_CTRL_MODE = 0b0000_0011
+MASK_FIFO_STATUS_FULL = 0b1000_0000
+MASK_FIFO_STATUS_WTM = 0b0100_0000
+MASK_FIFO_STATUS_OVERFLOW = 0b0010_0000
+MASK_FIFO_STATUS_NOT_EMPTY = 0b0001_0000
+MASK_FIFO_STATUS_SMPL_CNT_MSB = 0b0000_0011
 
+# -- Tap Status Values --
+TAP_NONE = 0
+TAP_SINGLE = 1
+TAP_DOUBLE = 2
+TAP_AXIS_X = 1
+TAP_AXIS_Y = 2
+TAP_AXIS_Z = 3
 
-def _twos_complement_to_int(val: int) -> int:
-    """Convert a two's complement value to a signed integer."""
-    if val & (1 << (15)) != 0:
-        val -= 1 << 16
-    return val
+# -- Interrupt Pins --
+INT_NONE = 0
+INT_PIN_1 = 1
+INT_PIN_2 = 2  # Data-ready can only be routed here
+
+# -- FIFO Settings --
+FIFO_MODE_BYPASS = 0b00
+FIFO_MODE_FIFO = 0b01
+FIFO_MODE_STREAM = 0b10
+FIFO_SIZES = (16, 32, 64, 128)  # Samples per sensor, index is the FIFO_CTRL value
+
+# -- Polling --
+DEFAULT_TIMEOUT_MS = 500
+BACKOFF_START_S = 0.0005  # First sleep after a few immediate polls
+BACKOFF_MAX_S = 0.008
+BACKOFF_SPIN_POLLS = 4
+
+# Configuration registers mirrored in the shadow cache: CTRL1 through CAL4_H
+SHADOW_FIRST = REG_CTRL1
+SHADOW_LENGTH = REG_CAL4_H - REG_CTRL1 + 1
+
+# Longest burst read done internally: TIMESTAMP_LOW through GZ_H
+SCRATCH_LENGTH = max(REG_GZ_H - REG_TIMESTAMP_LOW + 1, SHADOW_LENGTH)
+
+ACCEL_SCALES = (2, 4, 8, 16)  # Index is the CTRL2.aFS value
+GYRO_SCALES = (16, 32, 64, 128, 256, 512, 1024, 2048)  # Index is the CTRL3.gFS value
+
+# Output data rates in Hz, index is the CTRL2.aODR/CTRL3.gODR value. With both
+#   sensors on, the actual rates are about 10% lower (set by the gyro).
+ODRS = (8000, 4000, 2000, 1000, 500, 250, 125, 62.5, 31.25)
+# Accelerometer-only low power rates, index is the CTRL2.aODR value minus 12
+ACCEL_LOW_POWER_ODRS = (128, 21, 11, 3)
+ACCEL_LOW_POWER_ODR_OFFSET = 12
+# 8000, 4000 and 2000 Hz only exist with the gyro on. The reset default is 8000 Hz,
+#   which is why an accel enabled on its own used to give no data.
+ACCEL_ONLY_MIN_ODR_CODE = 3
+
+# -- Host Delta Offsets --
+# Accel offsets are signed 4.12 fixed point in g, gyro offsets signed 11.5 in dps
+ACCEL_OFFSET_LSB_PER_G = 4096
+GYRO_OFFSET_LSB_PER_DPS = 32
+NO_OFFSETS = ((0, 0, 0), (0, 0, 0))  # (accel, gyro), as after a reset
+
+# -- Power Presets --
+# (accel ODR, gyro ODR or None for gyro off)
+PRESET_ACTIVE = (500, 500)  # Full 6DoF
+PRESET_IDLE = (31.25, None)  # Accel-only, enough for motion detection
+PRESET_LOW_POWER = (11, None)  # Accel-only low power mode
+
+
+class QMI8658TimeoutError(RuntimeError):
+    """The QMI8658 didn't reach the expected state before the deadline."""
+
+
+def _accel_odr_code(value: float) -> int:
+    if value in ODRS:
+        return ODRS.index(value)
+    if value in ACCEL_LOW_POWER_ODRS:
+        return ACCEL_LOW_POWER_ODRS.index(value) + ACCEL_LOW_POWER_ODR_OFFSET
+    raise RuntimeError(
+        "Invalid accelerometer ODR value. Valid values are 8000, 4000, 2000, 1000, "
+        "500, 250, 125, 62.5, 31.25, or low power 128, 21, 11, or 3."
+    )
+
+
+def _check_accel_mode(ctrl2: int, ctrl7: int):
+    # Reject CTRL2.aODR and CTRL7 combinations the datasheet doesn't allow
+    if not ctrl7 & MASK_ACCEL_ENABLE:
+        return
+    code = ctrl2 & MASK_ACCEL_ODR
+    if ctrl7 & MASK_GYRO_ENABLE:
+        if code >= ACCEL_LOW_POWER_ODR_OFFSET:
+            raise RuntimeError("Accel low power mode needs the gyro disabled.")
+    elif code < ACCEL_ONLY_MIN_ODR_CODE:
+        raise RuntimeError(
+            "Invalid accelerometer ODR value for accel-only mode. Valid values are "
+            "1000 Hz or lower, or enable the gyro first."
+        )
+
+
+class InterruptPin:
+    """One of the IMU's interrupt lines, read as a level or as latched rising edges.
+
+    In edge mode `value` is True if any edge arrived since the last read, so short
+    pulses aren't missed between main loop iterations.
+    """
+
+    def __init__(self, pin: Pin, count_edges: bool = False):
+        self._io = None
+        self._counter = None
+        if count_edges:
+            # Only imported when edges are counted, to keep it off the boot path
+            import countio
+
+            self._counter = countio.Counter(pin, edge=countio.Edge.RISE)
+        else:
+            self._io = DigitalInOut(pin)
+            self._io.direction = Direction.INPUT
+            self._io.pull = Pull.UP
+
+    @property
+    def value(self) -> bool:
+        if self._counter is not None:
+            if self._counter.count == 0:
+                return False
+            self._counter.reset()
+            return True
+        return self._io.value
+
+    def deinit(self):
+        if self._counter is not None:
+            self._counter.deinit()
+        else:
+            self._io.deinit()
 
 
 class QMI8658:
@@ -130,75 +281,204 @@ class QMI8658:
         int1: Pin | None = None,
         int2: Pin | None = None,
         address: int = I2C_ADDRESS_H,
+        count_edges: bool = False,
+        timeout_ms: int = DEFAULT_TIMEOUT_MS,
+        config: bytes | None = None,
+        offsets: tuple | None = None,
     ):
+        """Pass the `config` saved from a previous instance (before a deep sleep,
+        say) to skip the reset and setup if the chip still holds that config.
+        `resumed` says whether it did. The host delta offsets can't be read back,
+        so pass the ones the chip was left with as `offsets` too.
+        """
         self.i2c = i2c
         self.address = address
+        self.timeout_ms = timeout_ms
         self.int1 = int1
         self.int2 = int2
 
         if self.int1 is not None:
-            self.int1 = DigitalInOut(int1)
-            self.int1.direction = Direction.INPUT
-            self.int1.pull = Pull.UP
+            self.int1 = InterruptPin(int1, count_edges)
         if self.int2 is not None:
-            self.int2 = DigitalInOut(int2)
-            self.int2.direction = Direction.INPUT
-            self.int2.pull = Pull.UP
+            self.int2 = InterruptPin(int2, count_edges)
+        self._data_ready_pin = None
+        self._fifo_pin = None
+        self._motion_pin = None
 
         self._accel_enabled = False
         self._gyro_enabled = False
         self._accel_scale = 2
         self._gyro_scale = 16
         self._ahb_clock_gated = True
+        self._fifo_mode = FIFO_MODE_BYPASS
+        self.offsets = NO_OFFSETS  # Last loaded by set_offsets()
 
-        while not self.i2c.try_lock():
-            pass
+        # Preallocated scratch buffers so that register I/O doesn't allocate
+        self._out = bytearray(2)
+        self._buf = bytearray(SCRATCH_LENGTH)
+
+        # Shadow copy of the configuration registers, kept up to date on every write
+        #   so that getters and read-modify-writes don't need to touch the bus
+        self._shadow = bytearray(SHADOW_LENGTH)
+        self._shadow_valid = False
+        self.resumed = False
+
+        self._wait_until(self.i2c.try_lock, "I2C bus lock")
+        if config is not None and self._resume(config):
+            if offsets is not None:
+                self.offsets = offsets
+            return
         self._verify_whoami()
         self.reset()
-        self.auto_increment = True
+        self.sync()  # Also turns on auto-increment
         self.ahb_clock_gated = False
         self.enable_sync_sample_mode()
 
+    def _resume(self, config: bytes) -> bool:
+        # The chip stays powered through a deep sleep, so its registers may still
+        #   hold `config`. One burst read checks them all. A reset chip fails the
+        #   check, since the burst needs the auto-increment bit that a reset clears.
+        if len(config) != SHADOW_LENGTH:
+            return False
+        self._shadow[:] = config
+        self._shadow_valid = True
+        if not self.verify():
+            self._shadow_valid = False
+            return False
+        ctrl7 = self._shadow[REG_CTRL7 - SHADOW_FIRST]
+        self._accel_enabled = ctrl7 & MASK_ACCEL_ENABLE != 0
+        self._gyro_enabled = ctrl7 & MASK_GYRO_ENABLE != 0
+        self._ahb_clock_gated = False  # Turned off by every cold start
+        self.resumed = True
+        return True
+
     def _verify_whoami(self):
-        if self.read_register(REG_WHO_AM_I, 1)[0] != VALUE_WHO_AM_I:
+        if self.read_register_byte(REG_WHO_AM_I) != VALUE_WHO_AM_I:
             raise RuntimeError("Failed to find QMI8658.")
 
     def read_register(self, register: int, length: int) -> bytearray:
-        self.i2c.writeto(self.address, bytearray([register]))
         result = bytearray(length)
-        self.i2c.readfrom_into(self.address, result)
+        self.read_register_into(register, result)
         return result
 
+    def read_register_into(
+        self, register: int, buffer: bytearray, start: int = 0, end: int | None = None
+    ):
+        # Register address and data go out in one repeated-start transfer. The
+        #   start/end arguments are used instead of slicing, which would allocate.
+        self._out[0] = register
+        if end is None:
+            end = len(buffer)
+        self.i2c.writeto_then_readfrom(
+            self.address, self._out, buffer, out_end=1, in_start=start, in_end=end
+        )
+
+    def read_register_byte(self, register: int) -> int:
+        self.read_register_into(register, self._buf, end=1)
+        return self._buf[0]
+
+    def read_register_cached(self, register: int) -> int:
+        # Serve configuration registers from the shadow cache, anything else from
+        #   the bus
+        offset = register - SHADOW_FIRST
+        if self._shadow_valid and 0 <= offset < SHADOW_LENGTH:
+            return self._shadow[offset]
+        return self.read_register_byte(register)
+
     def write_register(self, register: int, data: int):
-        self.i2c.writeto(self.address, bytearray([register, data]))
+        self._out[0] = register
+        self._out[1] = data
+        self.i2c.writeto(self.address, self._out)
+        offset = register - SHADOW_FIRST
+        if 0 <= offset < SHADOW_LENGTH:
+            self._shadow[offset] = data
+
+    def sync(self):
+        """Refill the shadow cache from the chip with one burst read."""
+        # The burst needs auto-increment, which a reset turns off
+        ctrl1 = self.read_register_byte(REG_CTRL1)
+        if ctrl1 & MASK_AUTO_INCREMENT == 0:
+            self.write_register(REG_CTRL1, ctrl1 | MASK_AUTO_INCREMENT)
+        self.read_register_into(SHADOW_FIRST, self._shadow)
+        self._shadow_valid = True
+
+    def verify(self) -> bool:
+        """Re-read the configuration registers and check them against the cache."""
+        if not self._shadow_valid:
+            return False
+        self.read_register_into(SHADOW_FIRST, self._buf, end=SHADOW_LENGTH)
+        for offset in range(SHADOW_LENGTH):
+            # CTRL9 is a command mailbox, not configuration
+            if offset == REG_CTRL9 - SHADOW_FIRST:
+                continue
+            if self._buf[offset] != self._shadow[offset]:
+                return False
+        return True
+
+    @property
+    def config(self) -> bytes | None:
+        """Copy of the configuration registers (CTRL1 through CAL4_H), if known."""
+        return bytes(self._shadow) if self._shadow_valid else None
+
+    def _wait_until(self, ready, what: str, timeout_ms: int | None = None):
+        # Poll ready() until it's truthy, spinning for the first few polls and then
+        #   sleeping with exponential backoff so a wedged chip doesn't eat the CPU
+        if timeout_ms is None:
+            timeout_ms = self.timeout_ms
+        deadline = time.monotonic_ns() + timeout_ms * 1_000_000
+        polls = 0
+        delay = BACKOFF_START_S
+        while not ready():
+            if time.monotonic_ns() > deadline:
+                raise QMI8658TimeoutError(f"Timed out waiting for {what}.")
+            polls += 1
+            if polls > BACKOFF_SPIN_POLLS:
+                time.sleep(delay)
+                delay = min(delay * 2, BACKOFF_MAX_S)
+
+    def _wait_for_status(self, register: int, mask: int, value: int, what: str):
+        # Wait until (register & mask) == value
+        self._wait_until(
+            lambda: self.read_register_byte(register) & mask == value, what
+        )
 
     def send_command(self, command: int):
         # Write command to CTRL9 and wait for the status bit to go high
         self.write_register(REG_CTRL9, command)
-        status = self.read_register(REG_STATUSINT, 1)[0]
-        while status & MASK_STATUSINT_CTRL9DONE == 0:
-            status = self.read_register(REG_STATUSINT, 1)[0]
+        self._wait_for_status(
+            REG_STATUSINT,
+            MASK_STATUSINT_CTRL9DONE,
+            MASK_STATUSINT_CTRL9DONE,
+            "CTRL9 command",
+        )
 
         # Write ACK to CTRL9 and wait for the status bit to go low
         self.write_register(REG_CTRL9, CTRL_CMD_ACK)
-        status = self.read_register(REG_STATUSINT, 1)[0]
-        while status & MASK_STATUSINT_CTRL9DONE != 0:
-            status = self.read_register(REG_STATUSINT, 1)[0]
+        self._wait_for_status(
+            REG_STATUSINT, MASK_STATUSINT_CTRL9DONE, 0, "CTRL9 acknowledge"
+        )
 
     def set_register_bits(self, register: int, bits: int):
-        self.write_register(register, self.read_register(register, 1)[0] | bits)
+        self.write_register(register, self.read_register_cached(register) | bits)
 
     def clear_register_bits(self, register: int, bits: int):
-        self.write_register(register, self.read_register(register, 1)[0] & ~bits)
+        self.write_register(register, self.read_register_cached(register) & ~bits)
+
+    def update_register_bits(self, register: int, mask: int, bits: int):
+        value = self.read_register_cached(register)
+        self.write_register(register, value & ~mask | bits & mask)
 
     def reset(self):
         self.write_register(REG_RESET, VALUE_RESET_DEFAULT)
         # NB: This takes about 15ms to complete?
+        # Everything goes back to defaults, so the cache is stale until sync()
+        self._shadow_valid = False
+        self.offsets = NO_OFFSETS
 
     @property
     def auto_increment(self) -> bool:
         return (
-            self.read_register(REG_CTRL1, 1)[0] & MASK_AUTO_INCREMENT
+            self.read_register_cached(REG_CTRL1) & MASK_AUTO_INCREMENT
             == MASK_AUTO_INCREMENT
         )
 
@@ -228,57 +508,139 @@ class QMI8658:
     @property
     def accel_enabled(self) -> bool:
         return (
-            self.read_register(REG_CTRL7, 1)[0] & MASK_ACCEL_ENABLE == MASK_ACCEL_ENABLE
+            self.read_register_cached(REG_CTRL7) & MASK_ACCEL_ENABLE
+            == MASK_ACCEL_ENABLE
         )
 
     @accel_enabled.setter
     def accel_enabled(self, value):
+        ctrl7 = self.read_register_cached(REG_CTRL7)
         if value:
-            self.set_register_bits(REG_CTRL7, MASK_ACCEL_ENABLE)
-            # -- HACK: Why do I need to enable gyro to get accel data? --
-            self.gyro_enabled = True
-            # -----------------------------------------------------------
+            ctrl7 |= MASK_ACCEL_ENABLE
         else:
-            self.clear_register_bits(REG_CTRL7, MASK_ACCEL_ENABLE)
-        self._accel_enabled = value
+            ctrl7 &= ~MASK_ACCEL_ENABLE
+        _check_accel_mode(self.read_register_cached(REG_CTRL2), ctrl7)
+        self._write_register_if_changed(REG_CTRL7, ctrl7)
+        self._accel_enabled = bool(value)
 
     @property
     def gyro_enabled(self) -> bool:
         return (
-            self.read_register(REG_CTRL7, 1)[0] & MASK_GYRO_ENABLE == MASK_GYRO_ENABLE
+            self.read_register_cached(REG_CTRL7) & MASK_GYRO_ENABLE == MASK_GYRO_ENABLE
         )
 
     @gyro_enabled.setter
     def gyro_enabled(self, value):
+        ctrl7 = self.read_register_cached(REG_CTRL7)
         if value:
-            self.set_register_bits(REG_CTRL7, MASK_GYRO_ENABLE)
+            ctrl7 |= MASK_GYRO_ENABLE
         else:
-            self.clear_register_bits(REG_CTRL7, MASK_GYRO_ENABLE)
-            # -- HACK: Why do I need to enable gyro to get accel data? --
-            self.accel_enabled = False
-            # -----------------------------------------------------------
-        self._gyro_enabled = value
+            ctrl7 &= ~MASK_GYRO_ENABLE
+        _check_accel_mode(self.read_register_cached(REG_CTRL2), ctrl7)
+        self._write_register_if_changed(REG_CTRL7, ctrl7)
+        self._gyro_enabled = bool(value)
+
+    def _interrupt_pin(self, pin: int) -> InterruptPin | None:
+        if pin == INT_PIN_1:
+            return self.int1
+        if pin == INT_PIN_2:
+            return self.int2
+        return None
+
+    def configure_interrupts(
+        self,
+        data_ready: bool = False,
+        fifo: int = INT_NONE,
+        motion: int = INT_NONE,
+    ):
+        """Route data-ready (INT2 only), FIFO watermark and motion events to pins."""
+        int1_used = fifo == INT_PIN_1 or motion == INT_PIN_1
+        int2_used = data_ready or fifo == INT_PIN_2 or motion == INT_PIN_2
+        ctrl1 = self.read_register_cached(REG_CTRL1) & ~(
+            MASK_REG_CTRL1_INT1_EN
+            | MASK_REG_CTRL1_INT2_EN
+            | MASK_REG_CTRL1_FIFO_INT_SEL
+        )
+        if int1_used:
+            ctrl1 |= MASK_REG_CTRL1_INT1_EN
+        if int2_used:
+            ctrl1 |= MASK_REG_CTRL1_INT2_EN
+        if fifo == INT_PIN_1:
+            ctrl1 |= MASK_REG_CTRL1_FIFO_INT_SEL
+        # Registers are only written if they change, so re-routing pins to match a
+        #   resumed chip doesn't touch the bus
+        self._write_register_if_changed(REG_CTRL1, ctrl1)
+
+        ctrl7 = self.read_register_cached(REG_CTRL7) | MASK_REG_CTRL7_DRDY_DIS
+        if data_ready:
+            ctrl7 &= ~MASK_REG_CTRL7_DRDY_DIS
+        self._write_register_if_changed(REG_CTRL7, ctrl7)
+
+        # Keep the CTRL9 handshake on STATUSINT so it doesn't pulse INT1
+        ctrl8 = (
+            self.read_register_cached(REG_CTRL8) | MASK_REG_CTRL8_HANDSHAKE_STATUSINT
+        )
+        if motion == INT_PIN_1:
+            ctrl8 |= MASK_REG_CTRL8_ACTIVITY_INT_SEL
+        else:
+            ctrl8 &= ~MASK_REG_CTRL8_ACTIVITY_INT_SEL
+        self._write_register_if_changed(REG_CTRL8, ctrl8)
+
+        self._data_ready_pin = self.int2 if data_ready else None
+        self._fifo_pin = self._interrupt_pin(fifo)
+        self._motion_pin = self._interrupt_pin(motion)
+
+    @property
+    def data_ready(self) -> bool:
+        # Checked on the INT2 pin without touching the bus when it's routed there
+        if self._data_ready_pin is not None:
+            return self._data_ready_pin.value
+        status = self.read_register_byte(REG_STATUSINT)
+        return (
+            status & MASK_STATUSINT_AVAIL != 0 and status & MASK_STATUSINT_LOCKED == 0
+        )
+
+    @property
+    def fifo_watermark_reached(self) -> bool:
+        if self._fifo_pin is not None:
+            return self._fifo_pin.value
+        return self.fifo_status & MASK_FIFO_STATUS_WTM != 0
+
+    @property
+    def motion_event(self) -> bool:
+        if self._motion_pin is not None:
+            return self._motion_pin.value
+        return self.read_register_byte(REG_STATUS1) != 0
+
+    def _wait_for_data(self):
+        # Waits on the INT2 pin instead of the bus when data-ready is routed there.
+        #   Data is usually already there, so skip building the closure if it is.
+        if not self.data_ready:
+            self._wait_until(lambda: self.data_ready, "sensor data")
 
     @property
     def accel_raw(self) -> tuple(int, int, int):
         if not self._accel_enabled:
             raise RuntimeError("Accelerometer is not enabled.")
-        # Read STATUSINT register until STATUSINT.Avail = 1 and STATUSINT.Locked = 1
-        status = self.read_register(REG_STATUSINT, 1)[0]
-        while status & MASK_STATUSINT_AVAIL == 0 or status & MASK_STATUSINT_LOCKED != 0:
-            status = self.read_register(REG_STATUSINT, 1)[0]
+        self._wait_for_data()
+        return self._read_accel_raw()
+
+    def try_read_accel_raw(self) -> tuple(int, int, int) | None:
+        if not self._accel_enabled:
+            raise RuntimeError("Accelerometer is not enabled.")
+        if not self.data_ready:
+            return None
+        return self._read_accel_raw()
 
+    def _read_accel_raw(self) -> tuple(int, int, int):
         if self._gyro_enabled:
             # Need to read all the way through the gyro (if enabled) data to clear the
             #   STATUSINT.Locked bit
-            val = self.read_register(REG_AX_L, 12)
+            self.read_register_into(REG_AX_L, self._buf, end=12)
         else:
-            val = self.read_register(REG_AX_L, 6)
+            self.read_register_into(REG_AX_L, self._buf, end=6)
 
-        x = _twos_complement_to_int(val[0] + 256 * val[1])
-        y = _twos_complement_to_int(val[2] + 256 * val[3])
-        z = _twos_complement_to_int(val[4] + 256 * val[5])
-        return (x, y, z)
+        return struct.unpack_from("<hhh", self._buf)
 
     @property
     def accel(self) -> tuple(float, float, float):
@@ -290,16 +652,19 @@ class QMI8658:
     def gyro_raw(self) -> tuple(int, int, int):
         if not self._gyro_enabled:
             raise RuntimeError("Gyro is not enabled.")
-        # Read STATUSINT register until STATUSINT.Avail = 1 and STATUSINT.Locked = 1
-        status = self.read_register(REG_STATUSINT, 1)[0]
-        while status & MASK_STATUSINT_AVAIL == 0 or status & MASK_STATUSINT_LOCKED != 0:
-            status = self.read_register(REG_STATUSINT, 1)[0]
-
-        val = self.read_register(REG_GX_L, 6)
-        x = _twos_complement_to_int(val[0] + 256 * val[1])
-        y = _twos_complement_to_int(val[2] + 256 * val[3])
-        z = _twos_complement_to_int(val[4] + 256 * val[5])
-        return (x, y, z)
+        self._wait_for_data()
+        return self._read_gyro_raw()
+
+    def try_read_gyro_raw(self) -> tuple(int, int, int) | None:
+        if not self._gyro_enabled:
+            raise RuntimeError("Gyro is not enabled.")
+        if not self.data_ready:
+            return None
+        return self._read_gyro_raw()
+
+    def _read_gyro_raw(self) -> tuple(int, int, int):
+        self.read_register_into(REG_GX_L, self._buf, end=6)
+        return struct.unpack_from("<hhh", self._buf)
 
     @property
     def gyro(self) -> tuple(float, float, float):
@@ -307,12 +672,63 @@ class QMI8658:
         ticks_per_dps = 2**15 // self.gyro_scale
         return (x / ticks_per_dps, y / ticks_per_dps, z / ticks_per_dps)
 
+    def read_motion(self, raw: bool = False, wait: bool = True) -> tuple | None:
+        """Read timestamp, temperature, accel and gyro in one burst.
+
+        Returns (timestamp, temperature, accel, gyro). Vectors for disabled sensors
+        are None. With raw=True everything is left in sensor ticks, otherwise
+        temperature is in C, accel in g and gyro in dps. With wait=False, returns
+        None instead of waiting when no new data is ready.
+        """
+        if not self._accel_enabled and not self._gyro_enabled:
+            raise RuntimeError("Neither accelerometer nor gyro is enabled.")
+        if wait:
+            self._wait_for_data()
+        elif not self.data_ready:
+            return None
+
+        # TIMESTAMP_LOW..GZ_H are contiguous, and reading through GZ_H also
+        #   clears STATUSINT.Locked
+        val = self._buf
+        self.read_register_into(REG_TIMESTAMP_LOW, val, end=SCRATCH_LENGTH)
+        timestamp = val[0] | val[1] << 8 | val[2] << 16
+        (temp, ax, ay, az, gx, gy, gz) = struct.unpack_from("<7h", val, 3)
+        accel = (ax, ay, az) if self._accel_enabled else None
+        gyro = (gx, gy, gz) if self._gyro_enabled else None
+        if raw:
+            return (timestamp, temp, accel, gyro)
+
+        if accel is not None:
+            ticks_per_g = 2**15 // self.accel_scale
+            accel = (
+                accel[0] / ticks_per_g,
+                accel[1] / ticks_per_g,
+                accel[2] / ticks_per_g,
+            )
+        if gyro is not None:
+            ticks_per_dps = 2**15 // self.gyro_scale
+            gyro = (
+                gyro[0] / ticks_per_dps,
+                gyro[1] / ticks_per_dps,
+                gyro[2] / ticks_per_dps,
+            )
+        return (timestamp, temp / 256, accel, gyro)
+
+    def try_read_motion(self, raw: bool = False) -> tuple | None:
+        return self.read_motion(raw=raw, wait=False)
+
     @property
-    def temperature_c(self) -> int:
-        val = self.read_register(REG_TEMP_L, 2)
-        temp = val[0] + 256 * val[1]
+    def motion(self) -> tuple:
+        return self.read_motion()
 
-        return _twos_complement_to_int(temp) / 256
+    @property
+    def motion_raw(self) -> tuple:
+        return self.read_motion(raw=True)
+
+    @property
+    def temperature_c(self) -> int:
+        self.read_register_into(REG_TEMP_L, self._buf, end=2)
+        return struct.unpack_from("<h", self._buf)[0] / 256
 
     @property
     def temperature_f(self) -> int:
@@ -320,7 +736,7 @@ class QMI8658:
 
     @property
     def revision_id(self) -> int:
-        return self.read_register(REG_REVISION_ID, 1)[0]
+        return self.read_register_byte(REG_REVISION_ID)
 
     @property
     def firmware_version(self) -> int:
@@ -332,22 +748,15 @@ class QMI8658:
 
     @property
     def accel_scale(self) -> int:
-        scale = (self.read_register(REG_CTRL2, 1)[0] & MASK_ACCEL_FULL_SCALE) >> 4
+        scale = (self.read_register_cached(REG_CTRL2) & MASK_ACCEL_FULL_SCALE) >> 4
         return 2 << scale
 
     @accel_scale.setter
     def accel_scale(self, value: 2 | 4 | 8 | 16):
-        if value == 2:
-            self.clear_register_bits(REG_CTRL2, 0b0111_0000)
-        elif value == 4:
-            self.clear_register_bits(REG_CTRL2, 0b0110_0000)
-            self.set_register_bits(REG_CTRL2, 0b0001_0000)
-        elif value == 8:
-            self.clear_register_bits(REG_CTRL2, 0b0101_0000)
-            self.set_register_bits(REG_CTRL2, 0b0010_0000)
-        elif value == 16:
-            self.clear_register_bits(REG_CTRL2, 0b0100_0000)
-            self.set_register_bits(REG_CTRL2, 0b0011_0000)
+        if value in ACCEL_SCALES:
+            self.update_register_bits(
+                REG_CTRL2, MASK_ACCEL_FULL_SCALE, ACCEL_SCALES.index(value) << 4
+            )
         else:
             raise RuntimeError(
                 "Invalid accelerometer scale value. Valid values are 2, 4, 8, or 16."
@@ -355,58 +764,92 @@ class QMI8658:
 
     @property
     def gyro_scale(self) -> int:
-        scale = (self.read_register(REG_CTRL3, 1)[0] & MASK_GYRO_FULL_SCALE) >> 4
+        scale = (self.read_register_cached(REG_CTRL3) & MASK_GYRO_FULL_SCALE) >> 4
         return (1 << scale) * 16
 
     @gyro_scale.setter
     def gyro_scale(self, value: 16 | 32 | 64 | 128 | 256 | 512 | 1024 | 2048):
-        if value == 16:
-            self.clear_register_bits(REG_CTRL3, 0b0111_0000)
-        elif value == 32:
-            self.clear_register_bits(REG_CTRL3, 0b0110_0000)
-            self.set_register_bits(REG_CTRL3, 0b0001_0000)
-        elif value == 64:
-            self.clear_register_bits(REG_CTRL3, 0b0101_0000)
-            self.set_register_bits(REG_CTRL3, 0b0010_0000)
-        elif value == 128:
-            self.clear_register_bits(REG_CTRL3, 0b0100_0000)
-            self.set_register_bits(REG_CTRL3, 0b0011_0000)
-        elif value == 256:
-            self.clear_register_bits(REG_CTRL3, 0b0011_0000)
-            self.set_register_bits(REG_CTRL3, 0b0100_0000)
-        elif value == 512:
-            self.clear_register_bits(REG_CTRL3, 0b0010_0000)
-            self.set_register_bits(REG_CTRL3, 0b0101_0000)
-        elif value == 1024:
-            self.clear_register_bits(REG_CTRL3, 0b0001_0000)
-            self.set_register_bits(REG_CTRL3, 0b0110_0000)
-        elif value == 2048:
-            self.set_register_bits(REG_CTRL3, 0b0111_0000)
+        if value in GYRO_SCALES:
+            self.update_register_bits(
+                REG_CTRL3, MASK_GYRO_FULL_SCALE, GYRO_SCALES.index(value) << 4
+            )
         else:
             raise RuntimeError(
                 "Invalid gyro scale value. Valid values are 16, 32, 64, 128, 256, 512, 1024, or 2048."
             )
 
+    @property
+    def accel_odr(self) -> float:
+        code = self.read_register_cached(REG_CTRL2) & MASK_ACCEL_ODR
+        if code >= ACCEL_LOW_POWER_ODR_OFFSET:
+            return ACCEL_LOW_POWER_ODRS[code - ACCEL_LOW_POWER_ODR_OFFSET]
+        return ODRS[code]
+
+    @accel_odr.setter
+    def accel_odr(self, value: float):
+        ctrl2 = self.read_register_cached(REG_CTRL2)
+        ctrl2 = ctrl2 & ~MASK_ACCEL_ODR | _accel_odr_code(value)
+        _check_accel_mode(ctrl2, self.read_register_cached(REG_CTRL7))
+        self._write_register_if_changed(REG_CTRL2, ctrl2)
+
+    @property
+    def accel_low_power(self) -> bool:
+        code = self.read_register_cached(REG_CTRL2) & MASK_ACCEL_ODR
+        return code >= ACCEL_LOW_POWER_ODR_OFFSET
+
+    @property
+    def gyro_odr(self) -> float:
+        return ODRS[self.read_register_cached(REG_CTRL3) & MASK_GYRO_ODR]
+
+    @gyro_odr.setter
+    def gyro_odr(self, value: float):
+        if value not in ODRS:
+            raise RuntimeError(
+                "Invalid gyro ODR value. Valid values are 8000, 4000, 2000, 1000, 500, "
+                "250, 125, 62.5, or 31.25."
+            )
+        self.update_register_bits(REG_CTRL3, MASK_GYRO_ODR, ODRS.index(value))
+
+    def apply_preset(self, preset: tuple):
+        """Switch ODRs and enabled sensors, writing only the registers that change."""
+        (accel_odr, gyro_odr) = preset
+        ctrl2 = self.read_register_cached(REG_CTRL2)
+        ctrl2 = ctrl2 & ~MASK_ACCEL_ODR | _accel_odr_code(accel_odr)
+        ctrl7 = self.read_register_cached(REG_CTRL7) | MASK_ACCEL_ENABLE
+        if gyro_odr is None:
+            ctrl7 &= ~MASK_GYRO_ENABLE
+        else:
+            ctrl7 |= MASK_GYRO_ENABLE
+        _check_accel_mode(ctrl2, ctrl7)
+        if gyro_odr is not None:
+            ctrl3 = self.read_register_cached(REG_CTRL3)
+            ctrl3 = ctrl3 & ~MASK_GYRO_ODR | ODRS.index(gyro_odr)
+            self._write_register_if_changed(REG_CTRL3, ctrl3)
+        self._write_register_if_changed(REG_CTRL2, ctrl2)
+        self._write_register_if_changed(REG_CTRL7, ctrl7)
+        self._accel_enabled = True
+        self._gyro_enabled = gyro_odr is not None
+
+    def _write_register_if_changed(self, register: int, value: int):
+        if self.read_register_cached(register) != value:
+            self.write_register(register, value)
+
     def self_test_accel(self) -> tuple:
         # Disable sensors (CTRL7 = 0x00)
         self.write_register(REG_CTRL7, 0x00)
 
         # Set proper accelerometer ODR (CTRL2.aODR) and bit CTRL2.aST (bit7) to 1
-        # NB: Currently hardcoded to 1kHz (0b0011)
-        self.write_register(REG_CTRL2, 0b1000_0011)
+        # NB: Currently hardcoded to 1kHz
+        self.write_register(REG_CTRL2, 0b1000_0000 | ODRS.index(1000))
 
         # Wait for STATUSINT.bit0 to go High
-        status = self.read_register(REG_STATUSINT, 1)[0]
-        while status & 0b0000_0001 == 0:
-            status = self.read_register(REG_STATUSINT, 1)[0]
+        self._wait_for_status(REG_STATUSINT, 0b0000_0001, 0b0000_0001, "self-test")
 
         # Set CTRL2.aST(bit7) to 0 to clear STATUSINT1.bit0
         self.clear_register_bits(REG_CTRL2, 0b1000_0000)
 
         # Wait fo STATUSINT1.bit0 to go Low
-        status = self.read_register(REG_STATUSINT, 1)[0]
-        while status & 0b0000_0001 != 0:
-            status = self.read_register(REG_STATUSINT, 1)[0]
+        self._wait_for_status(REG_STATUSINT, 0b0000_0001, 0, "self-test clear")
 
         # Read the Accel Self-Test result:
         #     X channel: dVX_L and dVX_H (registers 0x51 and 0x52)
@@ -421,3 +864,295 @@ class QMI8658:
                 "Failed accelerometer self-test.", {"x": x, "y": y, "z": z, "min": 400}
             )
         return (x, y, z)
+
+    @property
+    def fifo_frame_size(self) -> int:
+        # Each FIFO frame holds one 6-byte sample per enabled sensor (accel first)
+        return 6 * (int(self._accel_enabled) + int(self._gyro_enabled))
+
+    def enable_fifo(
+        self, watermark: int = 8, size: int = 64, mode: int = FIFO_MODE_STREAM
+    ):
+        if size not in FIFO_SIZES:
+            raise RuntimeError(
+                "Invalid FIFO size value. Valid values are 16, 32, 64, or 128."
+            )
+        if mode not in (FIFO_MODE_FIFO, FIFO_MODE_STREAM):
+            raise RuntimeError("Invalid FIFO mode. Use FIFO_MODE_FIFO or _STREAM.")
+        # FIFO settings only take effect while the sensors are disabled
+        ctrl7 = self.read_register_cached(REG_CTRL7)
+        self.clear_register_bits(REG_CTRL7, MASK_ACCEL_ENABLE | MASK_GYRO_ENABLE)
+        self.fifo_watermark = watermark
+        self.write_register(REG_FIFO_CTRL, FIFO_SIZES.index(size) << 2 | mode)
+        self.send_command(CTRL_CMD_RST_FIFO)
+        self.write_register(REG_CTRL7, ctrl7)
+        self._fifo_mode = mode
+
+    def disable_fifo(self):
+        self.write_register(REG_FIFO_CTRL, FIFO_MODE_BYPASS)
+        self.send_command(CTRL_CMD_RST_FIFO)
+        self._fifo_mode = FIFO_MODE_BYPASS
+
+    @property
+    def fifo_enabled(self) -> bool:
+        return self._fifo_mode != FIFO_MODE_BYPASS
+
+    @property
+    def fifo_watermark(self) -> int:
+        return self.read_register_byte(REG_FIFO_WTM_TH)
+
+    @fifo_watermark.setter
+    def fifo_watermark(self, value: int):
+        if not 1 <= value <= 255:
+            raise RuntimeError("Invalid FIFO watermark. Valid values are 1 to 255.")
+        self.write_register(REG_FIFO_WTM_TH, value)
+
+    @property
+    def fifo_status(self) -> int:
+        return self.read_register_byte(REG_FIFO_STATUS)
+
+    @property
+    def fifo_count(self) -> int:
+        """Number of complete frames currently waiting in the FIFO."""
+        frame_size = self.fifo_frame_size
+        if frame_size == 0:
+            return 0  # Nothing is enabled, so nothing is queued
+        # SMPL_CNT and STATUS are adjacent, so one read gets both halves of the count
+        self.read_register_into(REG_FIFO_SMPL_CNT, self._buf, end=2)
+        (cnt_lsb, status) = (self._buf[0], self._buf[1])
+        count_bytes = 2 * ((status & MASK_FIFO_STATUS_SMPL_CNT_MSB) << 8 | cnt_lsb)
+        return count_bytes // frame_size
+
+    def reset_fifo(self):
+        self.send_command(CTRL_CMD_RST_FIFO)
+
+    def read_fifo(self, buffer: bytearray, frames: int | None = None) -> int:
+        """Drain up to `frames` frames into `buffer` with a single I2C burst.
+
+        Each frame is `fifo_frame_size` bytes of little-endian int16s (ax, ay, az,
+        then gx, gy, gz if the gyro is enabled). Returns the number of frames read.
+        """
+        if not self.fifo_enabled:
+            raise RuntimeError("FIFO is not enabled.")
+        frame_size = self.fifo_frame_size
+        if frame_size == 0:
+            return 0
+        available = self.fifo_count
+        if frames is None or frames > available:
+            frames = available
+        frames = min(frames, len(buffer) // frame_size)
+        if frames == 0:
+            return 0
+
+        # Request FIFO read mode, burst the data out, then hand the FIFO back
+        self.send_command(CTRL_CMD_REQ_FIFO)
+        self.read_register_into(REG_FIFO_DATA, buffer, end=frames * frame_size)
+        self.clear_register_bits(REG_FIFO_CTRL, MASK_FIFO_CTRL_RD_MODE)
+        return frames
+
+    def _mg_to_threshold(self, mg: int) -> int:
+        # Motion thresholds are unsigned U3.5 fixed point in g (1/32 g per LSB)
+        return min(max(mg * 32 // 1000, 0), 255)
+
+    def _send_configuration(self, command: int, cal: tuple, stage: int):
+        # Motion engine settings go through CAL1_L..CAL4_L, with the stage in CAL4_H
+        for offset, value in enumerate(cal):
+            self.write_register(REG_CAL1_L + offset, value & 0xFF)
+        self.write_register(REG_CAL4_H, stage)
+        self.send_command(command)
+
+    def configure_motion(
+        self,
+        any_motion_mg: int = 500,
+        any_motion_window: int = 2,
+        no_motion_mg: int = 100,
+        no_motion_window: int = 50,
+    ):
+        """Set the any-motion and no-motion detector thresholds and windows.
+
+        Thresholds are per-axis sample-to-sample changes in mg, windows are in
+        accelerometer ODR samples. All three axes are used, ORed together.
+        """
+        any_thr = self._mg_to_threshold(any_motion_mg)
+        no_thr = self._mg_to_threshold(no_motion_mg)
+        mode = MASK_MOTION_MODE_ANY_XYZ | MASK_MOTION_MODE_NO_XYZ
+        self._send_configuration(
+            CTRL_CMD_CONFIGURE_MOTION,
+            (any_thr, any_thr, any_thr, no_thr, no_thr, no_thr, mode),
+            0x01,
+        )
+        # Significant motion isn't used, so its windows are left at zero
+        self._send_configuration(
+            CTRL_CMD_CONFIGURE_MOTION,
+            (any_motion_window, no_motion_window, 0, 0, 0, 0, 0),
+            0x02,
+        )
+
+    def configure_tap(
+        self,
+        peak_window: int = 20,
+        tap_window: int = 50,
+        double_tap_window: int = 250,
+        peak_threshold: int = 0x0500,
+        undefined_motion_threshold: int = 0x0200,
+    ):
+        """Set the tap detector timing (in ODR samples) and thresholds (U5.11 g^2)."""
+        # Priority 0 is X > Y > Z, alpha and gamma are the datasheet defaults
+        self._send_configuration(
+            CTRL_CMD_CONFIGURE_TAP,
+            (
+                peak_window,
+                0,
+                tap_window,
+                tap_window >> 8,
+                double_tap_window,
+                double_tap_window >> 8,
+                0,
+            ),
+            0x01,
+        )
+        self._send_configuration(
+            CTRL_CMD_CONFIGURE_TAP,
+            (
+                0x08,
+                0x20,
+                peak_threshold,
+                peak_threshold >> 8,
+                undefined_motion_threshold,
+                undefined_motion_threshold >> 8,
+                0,
+            ),
+            0x02,
+        )
+
+    def enable_motion_detection(
+        self, any_motion: bool = True, no_motion: bool = False, tap: bool = False
+    ):
+        bits = 0
+        if any_motion:
+            bits |= MASK_REG_CTRL8_ANY_MOTION_EN
+        if no_motion:
+            bits |= MASK_REG_CTRL8_NO_MOTION_EN
+        if tap:
+            bits |= MASK_REG_CTRL8_TAP_EN
+        # The detectors can only be switched while the sensors are disabled
+        ctrl7 = self.read_register_cached(REG_CTRL7)
+        self.clear_register_bits(REG_CTRL7, MASK_ACCEL_ENABLE | MASK_GYRO_ENABLE)
+        self.update_register_bits(
+            REG_CTRL8,
+            MASK_REG_CTRL8_ANY_MOTION_EN
+            | MASK_REG_CTRL8_NO_MOTION_EN
+            | MASK_REG_CTRL8_TAP_EN,
+            bits,
+        )
+        self.write_register(REG_CTRL7, ctrl7)
+
+    @property
+    def motion_status(self) -> int:
+        # STATUS1 flags are cleared by reading them
+        return self.read_register_byte(REG_STATUS1)
+
+    @property
+    def any_motion(self) -> bool:
+        # Only goes to the bus when the motion pin (if any) says there's an event
+        if self._motion_pin is not None and not self._motion_pin.value:
+            return False
+        return self.motion_status & MASK_STATUS1_ANY_MOTION != 0
+
+    @property
+    def tap_status(self) -> tuple(int, int, bool):
+        """Last tap as (TAP_NONE/SINGLE/DOUBLE, TAP_AXIS_*, positive polarity)."""
+        status = self.read_register_byte(REG_TAP_STATUS)
+        return (
+            status & MASK_TAP_STATUS_TYPE,
+            (status & MASK_TAP_STATUS_AXIS) >> 4,
+            status & MASK_TAP_STATUS_POLARITY == 0,
+        )
+
+    def set_offsets(self, accel: tuple(int, int, int), gyro: tuple(int, int, int)):
+        """Load host delta offsets (4.12 g and 11.5 dps) into the chip.
+
+        The chip subtracts these from every output, including the FIFO and the
+        motion engine, so corrected data costs the host nothing per sample.
+        """
+        for command, offsets in (
+            (CTRL_CMD_ACCEL_HOST_DELTA_OFFSET, accel),
+            (CTRL_CMD_GYRO_HOST_DELTA_OFFSET, gyro),
+        ):
+            for axis in range(3):
+                value = offsets[axis] & 0xFFFF
+                self.write_register(REG_CAL1_L + 2 * axis, value & 0xFF)
+                self.write_register(REG_CAL1_H + 2 * axis, value >> 8)
+            self.send_command(command)
+        self.offsets = (tuple(accel), tuple(gyro))
+
+    def calibrate(
+        self,
+        samples: int = 64,
+        max_accel_spread_mg: int = 100,
+        max_gyro_spread_dps: int = 5,
+    ) -> tuple:
+        """Estimate accel and gyro bias from a stationary window and apply it.
+
+        The badge can be lying in any orientation, gravity is assumed to be along
+        whichever axis reads the largest. Returns (accel, gyro) offsets in the
+        set_offsets() format, for persisting. If it fails, the previous offsets and
+        ODRs are put back.
+        """
+        preset = (self.accel_odr, self.gyro_odr if self._gyro_enabled else None)
+        previous = self.offsets
+        calibrated = False
+        try:
+            self.set_offsets(*NO_OFFSETS)
+            self.apply_preset(PRESET_ACTIVE)
+            (accel, gyro) = self._measure_offsets(
+                samples, max_accel_spread_mg, max_gyro_spread_dps
+            )
+            self.set_offsets(accel, gyro)
+            calibrated = True
+        finally:
+            self.apply_preset(preset)
+            if not calibrated:
+                self.set_offsets(*previous)
+        return (accel, gyro)
+
+    def _measure_offsets(
+        self, samples: int, max_accel_spread_mg: int, max_gyro_spread_dps: int
+    ) -> tuple:
+        sums = [0] * 6
+        lows = [32767] * 6
+        highs = [-32768] * 6
+        for _ in range(samples):
+            (_, _, accel, gyro) = self.read_motion(raw=True)
+            for axis, value in enumerate(accel + gyro):
+                sums[axis] += value
+                lows[axis] = min(lows[axis], value)
+                highs[axis] = max(highs[axis], value)
+
+        accel_scale = self.accel_scale
+        gyro_scale = self.gyro_scale
+        ticks_per_g = 2**15 // accel_scale
+        ticks_per_dps = 2**15 // gyro_scale
+        for axis in range(6):
+            if axis < 3:
+                limit = max_accel_spread_mg * ticks_per_g // 1000
+            else:
+                limit = max_gyro_spread_dps * ticks_per_dps
+            if highs[axis] - lows[axis] > limit:
+                raise RuntimeError("Badge moved during calibration, keep it still.")
+
+        means = [total // samples for total in sums]
+        gravity_axis = 0
+        for axis in (1, 2):
+            if abs(means[axis]) > abs(means[gravity_axis]):
+                gravity_axis = axis
+        means[gravity_axis] -= ticks_per_g if means[gravity_axis] > 0 else -ticks_per_g
+
+        accel = tuple(
+            means[axis] * ACCEL_OFFSET_LSB_PER_G // ticks_per_g for axis in range(3)
+        )
+        gyro = tuple(
+            means[axis] * GYRO_OFFSET_LSB_PER_DPS // ticks_per_dps
+            for axis in range(3, 6)
+        )
+        return (accel, gyro)
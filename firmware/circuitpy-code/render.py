@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import time
+
+
+class RenderScheduler:
+    """Refreshes the display at a fixed frame budget, and only when something changed.
+
+    Auto-refresh is turned off, so any number of scene changes made during a tick
+    go out together in one frame. Call damage() after changing the scene and tick()
+    once per main loop iteration.
+
+    Pacing is done here rather than by displayio: a paced refresh() drops the frame
+    if it is called more than a frame late and blocks until the next frame
+    otherwise, which would stall every other task.
+    """
+
+    def __init__(self, display, target_fps: int = 30):
+        self.display = display
+        display.auto_refresh = False
+        self.target_fps = target_fps
+        self._dirty = True
+        self._last_frame = time.monotonic_ns()
+        self.frames = 0
+        self.dropped = 0
+
+    def set_budget(self, target_fps: int):
+        self.target_fps = target_fps
+
+    def damage(self):
+        self._dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @property
+    def frame_due(self) -> bool:
+        return self.ns_until_frame() == 0
+
+    def ns_until_frame(self) -> int:
+        next_frame = self._last_frame + 1_000_000_000 // self.target_fps
+        return max(next_frame - time.monotonic_ns(), 0)
+
+    def tick(self) -> bool:
+        """Push a frame if the scene changed and the budget allows. True if shown."""
+        if not self._dirty or not self.frame_due:
+            return False
+        self._last_frame = time.monotonic_ns()
+        shown = self.display.refresh(target_frames_per_second=None)
+        if shown:
+            self._dirty = False
+            self.frames += 1
+        else:
+            self.dropped += 1
+        return shown
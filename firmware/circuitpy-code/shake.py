@@ -0,0 +1,181 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+
+# -- Events (bit flags, several can happen in one batch) --
+EVENT_NONE = 0
+EVENT_SHAKE_STARTED = 0b01
+EVENT_SHAKE_ENDED = 0b10
+
+# -- Defaults, in raw accel ticks at the +/-2g scale (16384 ticks/g) --
+DEFAULT_START_THRESHOLD = 12000
+DEFAULT_STOP_THRESHOLD = 6000
+
+
+def _magnitude(x: int, y: int, z: int) -> int:
+    """Integer approximation of sqrt(x^2 + y^2 + z^2), within about 6.5%."""
+    x = abs(x)
+    y = abs(y)
+    z = abs(z)
+    # Sort so that x >= y >= z
+    if x < y:
+        x, y = y, x
+    if y < z:
+        y, z = z, y
+    if x < y:
+        x, y = y, x
+    return 60 * x + 25 * y + 19 * z >> 6
+
+
+class ShakeDetector:
+    """Streaming shake detector for raw accelerometer samples.
+
+    Gravity is estimated as the moving average of the last `window` samples, kept
+    in an int16 ring buffer with running sums, so each sample costs O(1) integer
+    work and nothing is allocated. A shake starts once the gravity-removed
+    magnitude stays above `start_threshold` for `start_samples` samples, and ends
+    once it stays below `stop_threshold` for `stop_samples` samples. No new shake
+    can start for `cooldown_samples` samples after one ends.
+    """
+
+    def __init__(
+        self,
+        window: int = 16,
+        start_threshold: int = DEFAULT_START_THRESHOLD,
+        stop_threshold: int = DEFAULT_STOP_THRESHOLD,
+        start_samples: int = 3,
+        stop_samples: int = 25,
+        cooldown_samples: int = 0,
+    ):
+        if window < 1 or window & (window - 1) != 0:
+            raise RuntimeError("Invalid shake window. It must be a power of two.")
+        if stop_threshold > start_threshold:
+            raise RuntimeError("Shake stop threshold must not be above the start.")
+        self.window = window
+        self._shift = 0
+        while 1 << self._shift < window:
+            self._shift += 1
+        self.start_threshold = start_threshold
+        self.stop_threshold = stop_threshold
+        self.start_samples = start_samples
+        self.stop_samples = stop_samples
+        self.cooldown_samples = cooldown_samples
+
+        self._history = array("h", [0] * (3 * window))
+        self._sum_x = 0
+        self._sum_y = 0
+        self._sum_z = 0
+        self._index = 0
+        self._primed = False
+        self._run = 0  # Consecutive samples on the other side of the threshold
+        self._cooldown = 0  # Samples left before another shake can start
+
+        self.shaking = False
+        self.magnitude = 0
+        self.intensity = 0  # Peak magnitude of the current (or last) shake
+
+    def reset(self):
+        self._primed = False
+        self._run = 0
+        self._cooldown = 0
+        self.shaking = False
+        self.magnitude = 0
+        self.intensity = 0
+
+    def _prime(self, x: int, y: int, z: int):
+        # Start the gravity estimate at the first sample instead of at zero
+        history = self._history
+        for i in range(0, 3 * self.window, 3):
+            history[i] = x
+            history[i + 1] = y
+            history[i + 2] = z
+        self._sum_x = x << self._shift
+        self._sum_y = y << self._shift
+        self._sum_z = z << self._shift
+        self._index = 0
+        self._primed = True
+
+    def update(self, x: int, y: int, z: int) -> int:
+        """Feed one raw sample, returns the EVENT_* flags it caused."""
+        if not self._primed:
+            self._prime(x, y, z)
+
+        # Swap the oldest sample for the new one in the running sums
+        history = self._history
+        i = self._index
+        self._sum_x += x - history[i]
+        self._sum_y += y - history[i + 1]
+        self._sum_z += z - history[i + 2]
+        history[i] = x
+        history[i + 1] = y
+        history[i + 2] = z
+        i += 3
+        self._index = 0 if i == 3 * self.window else i
+
+        shift = self._shift
+        magnitude = _magnitude(
+            x - (self._sum_x >> shift),
+            y - (self._sum_y >> shift),
+            z - (self._sum_z >> shift),
+        )
+        self.magnitude = magnitude
+
+        if not self.shaking:
+            if self._cooldown > 0:
+                self._cooldown -= 1
+                return EVENT_NONE
+            if magnitude < self.start_threshold:
+                self._run = 0
+                return EVENT_NONE
+            self._run += 1
+            if self._run == 1:
+                self.intensity = magnitude
+            elif magnitude > self.intensity:
+                self.intensity = magnitude
+            if self._run < self.start_samples:
+                return EVENT_NONE
+            self.shaking = True
+            self._run = 0
+            return EVENT_SHAKE_STARTED
+
+        if magnitude > self.intensity:
+            self.intensity = magnitude
+        if magnitude >= self.stop_threshold:
+            self._run = 0
+            return EVENT_NONE
+        self._run += 1
+        if self._run < self.stop_samples:
+            return EVENT_NONE
+        self.shaking = False
+        self._run = 0
+        self._cooldown = self.cooldown_samples
+        return EVENT_SHAKE_ENDED
+
+    def update_batch(
+        self, buffer: bytearray, frames: int, frame_size: int = 6, offset: int = 0
+    ) -> int:
+        """Feed `frames` samples from a FIFO buffer, returns the ORed EVENT_* flags.
+
+        Frames are `frame_size` bytes apart with the little-endian int16 accel
+        x, y, z at `offset` in each frame, as filled by QMI8658.read_fifo().
+        """
+        events = EVENT_NONE
+        for i in range(offset, offset + frames * frame_size, frame_size):
+            x = buffer[i] | buffer[i + 1] << 8
+            y = buffer[i + 2] | buffer[i + 3] << 8
+            z = buffer[i + 4] | buffer[i + 5] << 8
+            events |= self.update(
+                x - 65536 if x & 0x8000 else x,
+                y - 65536 if y & 0x8000 else y,
+                z - 65536 if z & 0x8000 else z,
+            )
+        return events
+
+    def update_samples(self, samples: array) -> int:
+        """Feed interleaved x, y, z samples (e.g. a recorded array('h'))."""
+        events = EVENT_NONE
+        for i in range(0, len(samples) - 2, 3):
+            events |= self.update(samples[i], samples[i + 1], samples[i + 2])
+        return events
@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import struct
+import alarm
+from qmi8658 import SHADOW_LENGTH
+
+# Where the badge was and how it was set up, kept in alarm.sleep_memory so a wake
+#   from deep sleep can carry on where it left off instead of starting fresh
+SLEEP_MEMORY_OFFSET = 0
+MAGIC = b"S8"
+VERSION = 1
+# Magic, version, app, app sub-state, menu position, answer index, brightness,
+#   flags, IMU config registers, accel xyz and gyro xyz offsets, checksum
+FORMAT = "<2sBBBBBBB{}s6hB".format(SHADOW_LENGTH)
+SIZE = struct.calcsize(FORMAT)
+
+NO_ANSWER = 0xFF
+FLAG_IMU_CONFIG = 1 << 0
+FLAG_OFFSETS = 1 << 1
+
+
+def _checksum(data: bytearray) -> int:
+    return sum(data[: SIZE - 1]) & 0xFF
+
+
+class Snapshot:
+    def __init__(
+        self,
+        app: int,
+        app_state: int = 0,
+        menu_position: int = 0,
+        answer_index: int | None = None,
+        brightness: int = 0,
+        imu_config: bytes | None = None,
+        offsets: tuple | None = None,
+    ):
+        self.app = app
+        self.app_state = app_state
+        self.menu_position = menu_position
+        self.answer_index = answer_index
+        self.brightness = brightness
+        self.imu_config = imu_config
+        self.offsets = offsets  # ((ax, ay, az), (gx, gy, gz)) as used by calibration
+
+
+def save(snapshot: Snapshot):
+    flags = 0
+    imu_config = bytes(SHADOW_LENGTH)
+    if snapshot.imu_config is not None:
+        flags |= FLAG_IMU_CONFIG
+        imu_config = snapshot.imu_config
+    offsets = ((0, 0, 0), (0, 0, 0))
+    if snapshot.offsets is not None:
+        flags |= FLAG_OFFSETS
+        offsets = snapshot.offsets
+    answer_index = snapshot.answer_index
+    data = bytearray(SIZE)
+    struct.pack_into(
+        FORMAT,
+        data,
+        0,
+        MAGIC,
+        VERSION,
+        snapshot.app,
+        snapshot.app_state,
+        snapshot.menu_position,
+        NO_ANSWER if answer_index is None else answer_index,
+        snapshot.brightness,
+        flags,
+        imu_config,
+        *offsets[0],
+        *offsets[1],
+        0,
+    )
+    data[SIZE - 1] = _checksum(data)
+    alarm.sleep_memory[SLEEP_MEMORY_OFFSET : SLEEP_MEMORY_OFFSET + SIZE] = data
+
+
+def load() -> Snapshot | None:
+    """Return the stored snapshot, or None if there isn't a valid one."""
+    data = alarm.sleep_memory[SLEEP_MEMORY_OFFSET : SLEEP_MEMORY_OFFSET + SIZE]
+    fields = struct.unpack_from(FORMAT, data)
+    (magic, version) = fields[0:2]
+    if magic != MAGIC or version != VERSION or fields[-1] != _checksum(data):
+        return None
+    (app, app_state, menu_position, answer_index, brightness, flags) = fields[2:8]
+    return Snapshot(
+        app,
+        app_state,
+        menu_position,
+        None if answer_index == NO_ANSWER else answer_index,
+        brightness,
+        fields[8] if flags & FLAG_IMU_CONFIG else None,
+        (fields[9:12], fields[12:15]) if flags & FLAG_OFFSETS else None,
+    )
+
+
+def clear():
+    alarm.sleep_memory[SLEEP_MEMORY_OFFSET] = 0
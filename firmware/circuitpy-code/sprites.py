@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import struct
+import bitmaptools
+import displayio
+
+# Packed sprite sheets are made from indexed BMPs by firmware/tools/pack_sprites.py.
+#   The header is followed by the palette (RGB888) and then the pixel rows, top
+#   to bottom, packed most-significant-pixel first and padded to whole bytes.
+MAGIC = b"M8SP"
+VERSION = 1
+HEADER_FORMAT = "<4sBBHHHB"  # Magic, version, bits per pixel, w, h, colors, transparent
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+NO_TRANSPARENCY = 0xFF
+BITS_PER_PIXEL = (1, 2, 4, 8)
+
+
+def read_header(file) -> tuple:
+    """Return (bits_per_pixel, width, height, colors, transparent_index)."""
+    header = bytearray(HEADER_SIZE)
+    if file.readinto(header) != HEADER_SIZE:
+        raise RuntimeError("Truncated sprite sheet header.")
+    (magic, version, bits, width, height, colors, transparent) = struct.unpack_from(
+        HEADER_FORMAT, header
+    )
+    if magic != MAGIC:
+        raise RuntimeError("Not a packed sprite sheet.")
+    if version != VERSION:
+        raise RuntimeError(
+            "Invalid sprite sheet version value. Valid values are: " + str(VERSION)
+        )
+    if bits not in BITS_PER_PIXEL:
+        raise RuntimeError(
+            "Invalid bits per pixel value. Valid values are: " + str(BITS_PER_PIXEL)
+        )
+    return (bits, width, height, colors, transparent)
+
+
+def load(path: str, bitmap: displayio.Bitmap = None) -> tuple:
+    """Load a packed sprite sheet, returns (bitmap, palette).
+
+    Pass a preallocated `bitmap` of the right size to fill it in place, otherwise
+    one is allocated.
+    """
+    with open(path, "rb") as file:
+        (bits, width, height, colors, transparent) = read_header(file)
+
+        rgb = bytearray(3 * colors)
+        file.readinto(rgb)
+        palette = displayio.Palette(colors)
+        for index in range(colors):
+            i = 3 * index
+            palette[index] = rgb[i] << 16 | rgb[i + 1] << 8 | rgb[i + 2]
+        if transparent != NO_TRANSPARENCY:
+            palette.make_transparent(transparent)
+
+        if bitmap is None:
+            bitmap = displayio.Bitmap(width, height, colors)
+        elif bitmap.width != width or bitmap.height != height:
+            raise RuntimeError("Bitmap size doesn't match the sprite sheet.")
+        # Rows go straight from the file into the bitmap, nothing is decoded in Python.
+        #   The first pixel of each byte is in its most significant bits.
+        bitmaptools.readinto(bitmap, file, bits, reverse_pixels_in_element=True)
+    return (bitmap, palette)
+
+
+def load_bmp(path: str, transparent: int = None) -> tuple:
+    """Load an uncompressed indexed BMP into RAM, returns (bitmap, palette).
+
+    Slower to load than a packed sheet, but drawn just as fast. `transparent` is an
+    RGB888 color to make transparent, if any.
+    """
+    with open(path, "rb") as file:
+        header = bytearray(54)
+        if file.readinto(header) != len(header) or header[:2] != b"BM":
+            raise RuntimeError("Not a BMP file.")
+        (pixel_offset,) = struct.unpack_from("<I", header, 10)
+        (dib_size, width, height, _, bits, compression) = struct.unpack_from(
+            "<IiiHHI", header, 14
+        )
+        if bits not in BITS_PER_PIXEL:
+            raise RuntimeError(
+                "Invalid BMP bit depth value. Valid values are: " + str(BITS_PER_PIXEL)
+            )
+        if compression != 0:
+            raise RuntimeError("Compressed BMPs aren't supported.")
+        (colors,) = struct.unpack_from("<I", header, 46)
+        colors = colors or 1 << bits
+
+        bgrx = bytearray(4 * colors)
+        file.seek(14 + dib_size)
+        file.readinto(bgrx)
+        palette = displayio.Palette(colors)
+        for index in range(colors):
+            i = 4 * index
+            color = bgrx[i + 2] << 16 | bgrx[i + 1] << 8 | bgrx[i]
+            palette[index] = color
+            if color == transparent:
+                palette.make_transparent(index)
+                transparent = None  # Only the first match
+
+        # Rows are padded to 4 bytes, and stored bottom-up unless the height is
+        #   negative
+        bitmap = displayio.Bitmap(width, abs(height), colors)
+        file.seek(pixel_offset)
+        bitmaptools.readinto(
+            bitmap,
+            file,
+            bits,
+            element_size=4,
+            reverse_pixels_in_element=True,
+            reverse_rows=height > 0,
+        )
+    return (bitmap, palette)
+
+
+def load_on_disk(path: str, transparent: int = None) -> tuple:
+    """Open a BMP without loading it into RAM, returns (bitmap, pixel_shader).
+
+    Pixels are read from flash on every refresh, so only use this for rarely shown
+    sheets. `transparent` is an RGB888 color to make transparent, if any.
+    """
+    bitmap = displayio.OnDiskBitmap(path)
+    shader = bitmap.pixel_shader
+    if transparent is not None and isinstance(shader, displayio.Palette):
+        for index in range(len(shader)):
+            if shader[index] == transparent:
+                shader.make_transparent(index)
+                break
+    return (bitmap, shader)
@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import time
+
+
+class BootProfiler:
+    """Timestamps each phase of startup so the slow ones show up over serial.
+
+    Create it before anything else is imported and call mark() at the end of each
+    phase. Times are measured from when it was created: the monotonic clock keeps
+    running across reloads and USB-connected wakes, so it can't tell how long ago
+    the badge woke. A mark given a budget warns if it was reached later than that.
+    """
+
+    def __init__(self):
+        self.start = time.monotonic_ns()
+        self._names = []
+        self._times = []
+
+    def mark(self, name: str, budget_ms: int = None) -> bool:
+        """Timestamp the end of a phase, returns False if it's over budget."""
+        stamp = time.monotonic_ns()
+        self._names.append(name)
+        self._times.append(stamp)
+        elapsed_ms = (stamp - self.start) // 1_000_000
+        if budget_ms is not None and elapsed_ms > budget_ms:
+            print(
+                "Boot over budget: {} at {} ms, budget is {} ms".format(
+                    name, elapsed_ms, budget_ms
+                )
+            )
+            return False
+        return True
+
+    def elapsed_ms(self) -> int:
+        return (time.monotonic_ns() - self.start) // 1_000_000
+
+    def report(self):
+        print("Boot profile (ms):")
+        last = self.start
+        for name, stamp in zip(self._names, self._times):
+            print(
+                "  {:>6} {:>6}  {}".format(
+                    (stamp - self.start) // 1_000_000, (stamp - last) // 1_000_000, name
+                )
+            )
+            last = stamp
+
+
+class Subsystems:
+    """Brings up each piece of hardware the first time something needs it.
+
+    Register an init function per subsystem with add(). require() runs any that
+    haven't run yet, and init_next() runs the next one still pending so the rest
+    can be brought up in the background once the first frame is out.
+    """
+
+    def __init__(self, profiler: BootProfiler = None):
+        self.profiler = profiler
+        self._inits = {}
+        self._pending = []
+
+    def add(self, name: str, init):
+        self._inits[name] = init
+        self._pending.append(name)
+
+    @property
+    def pending(self) -> bool:
+        return len(self._pending) > 0
+
+    def ready(self, name: str) -> bool:
+        return name not in self._pending
+
+    def require(self, *names):
+        for name in names:
+            if name in self._pending:
+                self._init(name)
+
+    def init_next(self) -> bool:
+        """Bring up the next pending subsystem, returns False if none are left."""
+        if not self._pending:
+            return False
+        self._init(self._pending[0])
+        return True
+
+    def _init(self, name: str):
+        # Removed first, so a failing init isn't retried on every loop
+        self._pending.remove(name)
+        self._inits[name]()
+        if self.profiler is not None:
+            self.profiler.mark("init " + name)
@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+from events import EventQueue
+
+# Input events are the event type in the high byte and the pad bits in the low byte
+EVENT_PRESS = 1
+EVENT_RELEASE = 2
+EVENT_LONG_PRESS = 3
+EVENT_CHORD = 4  # All of a chord's pads are down
+EVENT_TYPE_SHIFT = 8
+MASK_EVENT_PADS = 0xFF
+
+
+def event_type(event: int) -> int:
+    return event >> EVENT_TYPE_SHIFT
+
+
+def event_pads(event: int) -> int:
+    return event & MASK_EVENT_PADS
+
+
+class TouchInput:
+    """Debounced touch pads that report presses as events.
+
+    `pads` is a sequence of (TouchIn, bit) pairs. Every pad is read exactly once
+    per update() into a bitmask, and a change only counts once it has been the
+    same for `debounce_scans` scans in a row. Press, release and long press events
+    (after `long_press_scans` scans held) are put on `events` for each pad, and a
+    chord event for each mask in `chords` when all of its pads are down.
+    """
+
+    def __init__(
+        self,
+        pads: tuple,
+        events: EventQueue,
+        debounce_scans: int = 2,
+        long_press_scans: int = 30,
+        chords: tuple = (),
+    ):
+        self.pads = pads
+        self.events = events
+        self.debounce_scans = debounce_scans
+        self.long_press_scans = long_press_scans
+        self.chords = chords
+        self.pressed = 0  # Debounced bitmask of the pads that are down
+        self._raw = 0
+        self._same_scans = 0
+        self._held_scans = array("H", [0] * len(pads))
+        self._active_chords = 0  # Bit per entry in `chords`
+
+    def scan(self) -> int:
+        raw = 0
+        for pad, bit in self.pads:
+            if pad.value:
+                raw |= bit
+        return raw
+
+    def held(self, pads: int) -> bool:
+        """True if all of `pads` are down (debounced)."""
+        return self.pressed & pads == pads
+
+    def update(self):
+        raw = self.scan()
+        if raw != self._raw:
+            self._raw = raw
+            self._same_scans = 1
+        elif self._same_scans < self.debounce_scans:
+            self._same_scans += 1
+
+        if self._same_scans >= self.debounce_scans and raw != self.pressed:
+            changed = raw ^ self.pressed
+            self.pressed = raw
+            for _, bit in self.pads:
+                if changed & bit:
+                    kind = EVENT_PRESS if raw & bit else EVENT_RELEASE
+                    self.events.put(kind << EVENT_TYPE_SHIFT | bit)
+            self._update_chords()
+
+        for index, (_, bit) in enumerate(self.pads):
+            if not self.pressed & bit:
+                self._held_scans[index] = 0
+            elif self._held_scans[index] <= self.long_press_scans:
+                self._held_scans[index] += 1
+                # Sent once, on the scan the hold reaches the threshold
+                if self._held_scans[index] == self.long_press_scans:
+                    self.events.put(EVENT_LONG_PRESS << EVENT_TYPE_SHIFT | bit)
+
+    def _update_chords(self):
+        for index, chord in enumerate(self.chords):
+            flag = 1 << index
+            if self.pressed & chord == chord:
+                if not self._active_chords & flag:
+                    self._active_chords |= flag
+                    self.events.put(EVENT_CHORD << EVENT_TYPE_SHIFT | chord)
+            else:
+                self._active_chords &= ~flag
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import time
+
+# Easing works on integer progress from 0 to PROGRESS_ONE
+PROGRESS_SHIFT = 10
+PROGRESS_ONE = 1 << PROGRESS_SHIFT
+
+
+def ease_linear(p: int) -> int:
+    return p
+
+
+def ease_out_quad(p: int) -> int:
+    q = PROGRESS_ONE - p
+    return PROGRESS_ONE - (q * q >> PROGRESS_SHIFT)
+
+
+def ease_in_out_quad(p: int) -> int:
+    if p < PROGRESS_ONE // 2:
+        return 2 * p * p >> PROGRESS_SHIFT
+    q = PROGRESS_ONE - p
+    return PROGRESS_ONE - (2 * q * q >> PROGRESS_SHIFT)
+
+
+class Tween:
+    def __init__(self, start: tuple, end: tuple, duration_ns: int, apply, ease):
+        self.start = start
+        self.end = end
+        self.duration_ns = max(duration_ns, 1)
+        self.apply = apply
+        self.ease = ease
+        self.started_ns = time.monotonic_ns()
+        self.values = list(start)  # Reused every step and passed to apply()
+
+    def step(self, now_ns: int) -> bool:
+        """Move to the position for `now_ns`, returns False once finished."""
+        elapsed = now_ns - self.started_ns
+        if elapsed >= self.duration_ns:
+            for i in range(len(self.values)):
+                self.values[i] = self.end[i]
+            self.apply(self.values)
+            return False
+        e = self.ease(elapsed * PROGRESS_ONE // self.duration_ns)
+        for i in range(len(self.values)):
+            start = self.start[i]
+            self.values[i] = start + ((self.end[i] - start) * e >> PROGRESS_SHIFT)
+        self.apply(self.values)
+        return True
+
+
+class Animator:
+    """Fixed-duration tweens driven by time.monotonic_ns(), not by loop speed.
+
+    Only running tweens are kept, so settled things cost nothing per tick. Every
+    tick that moves something reports damage to the render scheduler (if given).
+    """
+
+    def __init__(self, renderer=None):
+        self.renderer = renderer
+        self._active = {}
+
+    @property
+    def busy(self) -> bool:
+        return len(self._active) > 0
+
+    def animate(
+        self,
+        key,
+        start: tuple,
+        end: tuple,
+        duration_ms: int,
+        apply,
+        ease=ease_out_quad,
+    ):
+        """Tween from `start` to `end`, calling apply(values) with each step.
+
+        Starting a tween for a key that is already animating replaces it, starting
+        from wherever the old one had got to.
+        """
+        running = self._active.get(key)
+        if running is not None:
+            start = tuple(running.values)
+        if start == tuple(end):
+            self._active.pop(key, None)
+            return
+        self._active[key] = Tween(start, end, duration_ms * 1_000_000, apply, ease)
+
+    def cancel(self, key):
+        self._active.pop(key, None)
+
+    def tick(self) -> bool:
+        """Step every running tween, returns True if anything moved."""
+        if not self._active:
+            return False
+        now = time.monotonic_ns()
+        finished = None
+        for key, tween in self._active.items():
+            if not tween.step(now):
+                if finished is None:
+                    finished = []
+                finished.append(key)
+        if finished is not None:
+            for key in finished:
+                del self._active[key]
+        if self.renderer is not None:
+            self.renderer.damage()
+        return True
@@ -0,0 +1,12 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+
+# The badge code is flat modules on the CIRCUITPY drive, not a package. Appended,
+#   so code.py doesn't shadow the standard library's code module.
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "circuitpy-code")
+)
@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+import math
+from array import array
+
+from shake import (
+    ShakeDetector,
+    EVENT_NONE,
+    EVENT_SHAKE_STARTED,
+    EVENT_SHAKE_ENDED,
+    _magnitude,
+)
+
+ONE_G = 16384  # Raw ticks at the +/-2g scale
+
+# Sample traces at 100 Hz, as interleaved x, y, z like a recorded array("h")
+NOISE = (0, 37, -52, 18, -9, 61, -33, 4)
+
+
+def _rest(samples: int, x: int = 0, y: int = 0, z: int = ONE_G) -> list:
+    trace = []
+    for i in range(samples):
+        n = NOISE[i % len(NOISE)]
+        trace += [x + n, y - n, z + n]
+    return trace
+
+
+def _shake(samples: int, amplitude: int = 3 * ONE_G // 2) -> list:
+    # Back and forth along x about 5 times a second
+    trace = []
+    for i in range(samples):
+        x = amplitude if i // 10 % 2 == 0 else -amplitude
+        trace += [x, 0, ONE_G]
+    return trace
+
+
+def _tilt(samples: int, degrees: int = 45) -> list:
+    # Slowly rotate from flat to `degrees` about the x axis
+    trace = []
+    for i in range(samples):
+        theta = math.radians(degrees * i / (samples - 1))
+        trace += [0, round(ONE_G * math.sin(theta)), round(ONE_G * math.cos(theta))]
+    return trace
+
+
+def _events(detector: ShakeDetector, trace: list) -> list:
+    samples = array("h", trace)
+    events = []
+    for i in range(0, len(samples), 3):
+        event = detector.update(samples[i], samples[i + 1], samples[i + 2])
+        if event != EVENT_NONE:
+            events.append(event)
+    return events
+
+
+def test_magnitude_error_bound():
+    worst = 0.0
+    for x in range(-30000, 30001, 2500):
+        for y in range(-30000, 30001, 2500):
+            for z in (-29000, -1000, 0, 7000, 30000):
+                exact = math.sqrt(x * x + y * y + z * z)
+                if exact > 1000:
+                    worst = max(worst, abs(_magnitude(x, y, z) / exact - 1))
+    assert worst < 0.065
+
+
+def test_shake_detected():
+    detector = ShakeDetector()
+    events = _events(detector, _rest(50) + _shake(60) + _rest(50))
+    assert events == [EVENT_SHAKE_STARTED, EVENT_SHAKE_ENDED]
+    assert not detector.shaking
+    assert detector.intensity > ONE_G
+
+
+def test_shake_during_cooldown_suppressed():
+    detector = ShakeDetector(cooldown_samples=100)
+    trace = _rest(50) + _shake(60) + _rest(60) + _shake(60) + _rest(50)
+    assert _events(detector, trace) == [EVENT_SHAKE_STARTED, EVENT_SHAKE_ENDED]
+
+
+def test_shake_after_cooldown_detected():
+    detector = ShakeDetector(cooldown_samples=100)
+    trace = _rest(50) + _shake(60) + _rest(150) + _shake(60) + _rest(50)
+    assert _events(detector, trace) == [
+        EVENT_SHAKE_STARTED,
+        EVENT_SHAKE_ENDED,
+        EVENT_SHAKE_STARTED,
+        EVENT_SHAKE_ENDED,
+    ]
+
+
+def test_static_tilt_not_detected():
+    detector = ShakeDetector()
+    trace = _rest(50) + _tilt(100) + _rest(100, y=11585, z=11585)
+    assert _events(detector, trace) == []
+    assert not detector.shaking
+
+
+def test_update_samples_matches_update():
+    trace = _rest(50) + _shake(60) + _rest(50)
+    flags = ShakeDetector().update_samples(array("h", trace))
+    assert flags == EVENT_SHAKE_STARTED | EVENT_SHAKE_ENDED
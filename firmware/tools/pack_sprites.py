@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2023 Tyler Crumpton for CrumpSpace
+#
+# SPDX-License-Identifier: MIT
+
+"""Convert an indexed BMP into the packed sprite format read by sprites.py.
+
+Run on a computer, not on the badge:
+
+    python3 pack_sprites.py cp_sprite_sheet.bmp cp_sprite_sheet.m8s
+
+Copy the output to the root of the CIRCUITPY drive.
+"""
+
+import argparse
+import struct
+import sys
+
+# Must match firmware/circuitpy-code/sprites.py
+MAGIC = b"M8SP"
+VERSION = 1
+HEADER_FORMAT = "<4sBBHHHB"
+NO_TRANSPARENCY = 0xFF
+BITS_PER_PIXEL = (1, 2, 4, 8)
+
+DEFAULT_TRANSPARENT = 0xFFFFFF
+
+
+def read_bmp(data: bytes) -> tuple:
+    """Return (width, height, palette, pixels) from an uncompressed indexed BMP.
+
+    Pixels are palette indices, one list per row, top to bottom.
+    """
+    if data[:2] != b"BM":
+        raise RuntimeError("Not a BMP file.")
+    (pixel_offset,) = struct.unpack_from("<I", data, 10)
+    (dib_size, width, height, _, bits, compression) = struct.unpack_from(
+        "<IiiHHI", data, 14
+    )
+    if bits not in BITS_PER_PIXEL:
+        raise RuntimeError(
+            "Invalid BMP bit depth value. Valid values are: " + str(BITS_PER_PIXEL)
+        )
+    if compression != 0:
+        raise RuntimeError("Compressed BMPs aren't supported.")
+    (colors,) = struct.unpack_from("<I", data, 46)
+    colors = colors or 1 << bits
+
+    palette = []
+    for index in range(colors):
+        (b, g, r) = struct.unpack_from("<BBB", data, 14 + dib_size + 4 * index)
+        palette.append(r << 16 | g << 8 | b)
+
+    # Positive heights are stored bottom-up, rows padded to 4 bytes
+    top_down = height < 0
+    height = abs(height)
+    stride = (width * bits + 31) // 32 * 4
+    mask = (1 << bits) - 1
+    pixels = []
+    for y in range(height):
+        row = y if top_down else height - 1 - y
+        start = pixel_offset + row * stride
+        line = []
+        for x in range(width):
+            bit = x * bits
+            byte = data[start + bit // 8]
+            line.append(byte >> (8 - bits - bit % 8) & mask)
+        pixels.append(line)
+    return (width, height, palette, pixels)
+
+
+def pack(width: int, height: int, palette: list, pixels: list, transparent) -> bytes:
+    if len(palette) > 256:
+        raise RuntimeError("Sprite sheets can't have more than 256 colors.")
+    # Use the smallest depth that fits the palette, less to read at boot
+    bits = next(b for b in BITS_PER_PIXEL if len(palette) <= 1 << b)
+    transparent_index = NO_TRANSPARENCY
+    if transparent is not None and transparent in palette:
+        transparent_index = palette.index(transparent)
+
+    out = bytearray(
+        struct.pack(
+            HEADER_FORMAT,
+            MAGIC,
+            VERSION,
+            bits,
+            width,
+            height,
+            len(palette),
+            transparent_index,
+        )
+    )
+    for color in palette:
+        out += bytes((color >> 16 & 0xFF, color >> 8 & 0xFF, color & 0xFF))
+
+    stride = (width * bits + 7) // 8
+    for line in pixels:
+        row = bytearray(stride)
+        for x, value in enumerate(line):
+            bit = x * bits
+            row[bit // 8] |= value << (8 - bits - bit % 8)
+        out += row
+    return bytes(out)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bmp", help="indexed BMP to convert")
+    parser.add_argument("output", help="packed sprite sheet to write")
+    parser.add_argument(
+        "--transparent",
+        default="{:06X}".format(DEFAULT_TRANSPARENT),
+        help="RGB hex color to make transparent, or 'none' (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    transparent = None
+    if args.transparent.lower() != "none":
+        transparent = int(args.transparent, 16)
+
+    with open(args.bmp, "rb") as file:
+        (width, height, palette, pixels) = read_bmp(file.read())
+    packed = pack(width, height, palette, pixels, transparent)
+    with open(args.output, "wb") as file:
+        file.write(packed)
+    print(
+        "Wrote {} ({}x{}, {} colors, {} bytes)".format(
+            args.output, width, height, len(palette), len(packed)
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())